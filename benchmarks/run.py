@@ -0,0 +1,117 @@
+"""
+Benchmark headless (tanpa Streamlit) untuk tahap muat, filter, rollup LRA dan
+ekspor, memakai data sintetis. Contoh:
+
+    python -m benchmarks.run --rows 100000 1000000 --output bench.json
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import make_bukubesar, make_coa
+from core import snapshot
+from core.coa import CoaIndex
+from core.cube import LedgerCube
+from core.export import export_to_file
+from core.ledger import DateIndex, filter_mask, prepare_bukubesar, prepare_coa, run_query
+from core.rollup import build_lra
+from core.search import UraianIndex
+
+
+def measure(fn, repeat=3):
+    """
+    Waktu terbaik dari `repeat` kali jalan dan puncak memori (tracemalloc) satu kali jalan.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 1e6}, result
+
+
+def run_benchmarks(n_rows, n_leaves=5000, repeat=3, export_rows=100_000, seed=0):
+    coa = prepare_coa(make_coa(n_leaves, seed=seed))
+    raw = make_bukubesar(n_rows, coa, seed=seed)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # ================== LOAD ==================
+        snapshot.CACHE_DIR = Path(tmp) / "cache"
+        source = Path(tmp) / "bukubesar.xlsb"
+        source.write_bytes(os.urandom(64))
+
+        results["load.snapshot_build"], _ = measure(
+            lambda: snapshot.build_snapshot(source, lambda p: raw), repeat)
+        results["load.snapshot_read"], loaded = measure(
+            lambda: snapshot.load_snapshot(source, lambda p: raw), repeat)
+        results["load.prepare"], bukubesar = measure(lambda: prepare_bukubesar(loaded), repeat)
+
+        # ================== INDEX ==================
+        results["index.coa"], coa_index = measure(lambda: CoaIndex(coa), repeat)
+        results["index.cube"], cube = measure(lambda: LedgerCube(bukubesar), repeat)
+        results["index.date"], date_index = measure(lambda: DateIndex(bukubesar), repeat)
+        results["index.uraian"], search_index = measure(lambda: UraianIndex(bukubesar["uraian"]), repeat)
+
+        # ================== FILTER ==================
+        kode_akun = coa_index.children["5"][0]
+        unit = bukubesar["nm_unit"].cat.categories[0]
+        args = dict(kode_akun=kode_akun, jenis_transaksi=["Jurnal Umum", "Jurnal Pengeluaran"],
+                    unit=unit, tipe="Debet")
+        results["filter.mask"], _ = measure(lambda: filter_mask(bukubesar, **args), repeat)
+        results["filter.cube_saldo"], _ = measure(lambda: cube.query(**args), repeat)
+        period_args = dict(args, periode=("2024-03-01", "2024-03-31"))
+        results["filter.period_index"], _ = measure(
+            lambda: run_query(bukubesar, period_args, date_index), repeat)
+        search_args = dict(kode_akun="5", kata_kunci='honor "rapat koordinasi"')
+        results["filter.search_index"], _ = measure(
+            lambda: run_query(bukubesar, search_args, search_index=search_index), repeat)
+
+        # ================== ROLLUP ==================
+        results["rollup.lra"], _ = measure(lambda: build_lra(bukubesar, coa), repeat)
+
+        # ================== EXPORT ==================
+        subset = bukubesar.iloc[:export_rows]
+        for fmt, label in (("CSV", "csv"), ("Parquet", "parquet"), ("Excel (xlsx)", "xlsx")):
+            results[f"export.{label}"], _ = measure(
+                lambda: os.remove(export_to_file(subset, fmt, directory=tmp)), 1)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark buku besar dengan data sintetis")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000], help="jumlah baris buku besar")
+    parser.add_argument("--leaves", type=int, default=5000, help="jumlah akun kd_lv_6 pada COA")
+    parser.add_argument("--repeat", type=int, default=3, help="pengulangan per kasus (diambil yang tercepat)")
+    parser.add_argument("--export-rows", type=int, default=100_000, help="baris yang diekspor")
+    parser.add_argument("--output", help="simpan hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for n_rows in args.rows:
+        print(f"== {n_rows:,} baris ==")
+        results = run_benchmarks(n_rows, args.leaves, args.repeat, args.export_rows)
+        for name, stats in results.items():
+            print(f"{name:<24} {stats['seconds'] * 1000:>10.1f} ms {stats['peak_mb']:>10.1f} MB")
+        report[str(n_rows)] = results
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
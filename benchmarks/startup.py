@@ -0,0 +1,85 @@
+"""
+Anggaran waktu startup aplikasi. Setiap pengukuran dijalankan di proses Python
+baru (impor dingin): satu kali jalan `streamlit_app.py` pada Main Page lewat
+AppTest, serta impor masing-masing modul halaman. Contoh:
+
+    python -m benchmarks.startup --output startup.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# Anggaran (detik) per pengukuran; melebihi anggaran -> exit code 1
+STARTUP_BUDGET = {
+    "app.main_page": 3.0,
+    "import.page.filterdata": 1.5,
+    "import.page.lra": 1.5,
+    "import.page.neraca": 1.5,
+    "import.page.neraca_saldo": 1.5,
+    "import.page.lo": 1.5,
+    "import.page.prosedur_analitis": 1.5,
+}
+
+_APP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+at = AppTest.from_file("streamlit_app.py", default_timeout=60).run()
+elapsed = time.perf_counter() - started
+pages = sorted(m for m in sys.modules if m.startswith("page."))
+print(json.dumps({"seconds": elapsed, "pages_loaded": pages, "errors": len(at.exception)}))
+"""
+
+_IMPORT_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started}}))
+"""
+
+
+def _run(code):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(repeat=3):
+    """
+    Waktu terbaik dari `repeat` proses baru untuk setiap pengukuran pada STARTUP_BUDGET.
+    """
+    results = {}
+    for name in STARTUP_BUDGET:
+        if name == "app.main_page":
+            code = _APP_SCRIPT
+        else:
+            code = _IMPORT_SCRIPT.format(module=name.removeprefix("import."))
+        runs = [_run(code) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["seconds"])
+        best["budget"] = STARTUP_BUDGET[name]
+        best["ok"] = best["seconds"] <= best["budget"] and not best.get("pages_loaded") and not best.get("errors")
+        results[name] = best
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ukur waktu startup aplikasi terhadap anggarannya")
+    parser.add_argument("--repeat", type=int, default=3, help="jumlah proses per pengukuran")
+    parser.add_argument("--output", help="simpan hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    results = measure_startup(args.repeat)
+    for name, stats in results.items():
+        status = "OK" if stats["ok"] else "LEWAT"
+        print(f"{name:<32} {stats['seconds'] * 1000:>8.0f} ms / {stats['budget'] * 1000:>6.0f} ms  {status}")
+        if stats.get("pages_loaded"):
+            print(f"    halaman ikut dimuat: {', '.join(stats['pages_loaded'])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(stats["ok"] for stats in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
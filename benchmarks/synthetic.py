@@ -0,0 +1,124 @@
+"""
+Generator data sintetis: COA berjenjang (Kode Akun 1..6) dan buku besar dengan
+kolom yang sama seperti bukubesar.xlsb, untuk benchmark tanpa data asli.
+"""
+import numpy as np
+import pandas as pd
+
+# Kelas akun level 1: (kode, nama, laporan)
+KELAS = [
+    ("1", "ASET", "Neraca"),
+    ("2", "KEWAJIBAN", "Neraca"),
+    ("3", "EKUITAS", "Neraca"),
+    ("4", "PENDAPATAN DAERAH", "LRA"),
+    ("5", "BELANJA DAERAH", "LRA"),
+    ("6", "PEMBIAYAAN DAERAH", "LRA"),
+    ("7", "PENDAPATAN DAERAH-LO", "LO"),
+    ("8", "BEBAN DAERAH", "LO"),
+]
+
+JENIS_TRANSAKSI = {
+    "Jurnal Umum": 0.30,
+    "Jurnal Pengeluaran": 0.25,
+    "Jurnal Penerimaan": 0.15,
+    "Jurnal Penyesuaian": 0.08,
+    "Jurnal Koreksi": 0.05,
+    "Jurnal Non RKUD": 0.04,
+    "Jurnal Pembiayaan": 0.02,
+    "Jurnal Balik": 0.02,
+    "Jurnal Eliminasi": 0.01,
+    "Jurnal Penutup": 0.03,
+    "Saldo Awal": 0.05,
+}
+
+URAIAN_TEMPLATES = [
+    "Belanja {barang} {vendor}",
+    "Pembayaran honorarium {kegiatan}",
+    "Perjalanan dinas {kegiatan}",
+    "Pembayaran kontrak No. {nomor} {vendor}",
+    "Penerimaan {pajak}",
+    "Setoran {pajak} bulan {bulan}",
+]
+BARANG = ["ATK", "Bahan Bakar", "Makan Minum", "Alat Listrik", "Cetak", "Modal Peralatan"]
+VENDOR = ["CV Maju Jaya", "PT Sinar Abadi", "CV Karya Mandiri", "PT Bangun Nusa", "UD Sentosa"]
+KEGIATAN = ["narasumber", "rapat koordinasi", "monitoring", "sosialisasi", "bimtek"]
+PAJAK = ["Pajak Hotel", "Pajak Restoran", "Retribusi Pasar", "Pajak Reklame", "BPHTB"]
+BULAN = ["Januari", "Februari", "Maret", "April", "Mei", "Juni",
+         "Juli", "Agustus", "September", "Oktober", "November", "Desember"]
+
+
+def make_coa(n_leaves=5000, seed=0):
+    """
+    COA denormalisasi dengan kolom Laporan, Level, Kode Akun 1..6 dan Nama Akun 1..6.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    per_kelas = max(1, n_leaves // len(KELAS))
+    for kode1, nama1, laporan in KELAS:
+        for i in range(per_kelas):
+            parts = [kode1]
+            parts.append(str(1 + i % 4))
+            parts.append(f"{1 + (i // 4) % 6:02d}")
+            parts.append(f"{1 + (i // 24) % 8:02d}")
+            parts.append(f"{1 + (i // 192) % 20:02d}")
+            parts.append(f"{1 + i // 3840:04d}")
+            row = {"Laporan": laporan, "Level": 6}
+            for level in range(6, 0, -1):
+                kode = ".".join(parts[:level])
+                row[f"Kode Akun {level}"] = kode
+                row[f"Nama Akun {level}"] = nama1 if level == 1 else f"{nama1.title()} {kode}"
+            rows.append(row)
+    coa = pd.DataFrame(rows).drop_duplicates(subset=["Kode Akun 6"])
+    return coa.sample(frac=1, random_state=int(rng.integers(1 << 31))).reset_index(drop=True)
+
+
+def make_bukubesar(n_rows=100_000, coa=None, n_units=50, year=2024, seed=0):
+    """
+    Buku besar sintetis: setiap no_bukti terdiri dari dua baris seimbang
+    (debet = kredit), jenis transaksi berbobot, tanggal sepanjang tahun dan
+    uraian dari templat berulang. Tanggal berupa serial Excel seperti xlsb.
+    """
+    rng = np.random.default_rng(seed)
+    coa = make_coa(seed=seed) if coa is None else coa
+    leaves = coa["Kode Akun 6"].astype(str).to_numpy()
+    n_vouchers = max(1, n_rows // 2)
+
+    jenis = np.array(list(JENIS_TRANSAKSI))
+    weights = np.array(list(JENIS_TRANSAKSI.values()))
+    voucher_jenis = rng.choice(jenis, size=n_vouchers, p=weights / weights.sum())
+
+    start = pd.Timestamp(f"{year}-01-01")
+    serial_start = (start - pd.Timestamp("1899-12-30")).days
+    days = rng.integers(0, 365, size=n_vouchers)
+    days[voucher_jenis == "Saldo Awal"] = 0
+    days[voucher_jenis == "Jurnal Penutup"] = 364
+
+    units = np.array([f"Dinas {i:03d}" for i in range(n_units)])
+    voucher_unit = units[rng.integers(0, n_units, size=n_vouchers)]
+    # Nilai transaksi berdistribusi log-normal (kira-kira mengikuti Benford)
+    amount = np.round(rng.lognormal(mean=15, sigma=2, size=n_vouchers), 0)
+
+    uraian_pool = np.array([
+        template.format(
+            barang=rng.choice(BARANG), vendor=rng.choice(VENDOR), kegiatan=rng.choice(KEGIATAN),
+            nomor=f"{rng.integers(1, 999):03d}/{year}", pajak=rng.choice(PAJAK), bulan=rng.choice(BULAN),
+        )
+        for template in URAIAN_TEMPLATES
+        for _ in range(200)
+    ], dtype=object)
+    voucher_uraian = uraian_pool[rng.integers(0, len(uraian_pool), size=n_vouchers)]
+
+    def rows(side):
+        return pd.DataFrame({
+            "no_bukti": [f"BKT/{year}/{i:07d}" for i in range(n_vouchers)],
+            "tgl_transaksi": (serial_start + days).astype("float64"),
+            "jns_transaksi": voucher_jenis,
+            "nm_unit": voucher_unit,
+            "kd_lv_6": leaves[rng.integers(0, len(leaves), size=n_vouchers)],
+            "debet": amount if side == "debet" else 0.0,
+            "kredit": amount if side == "kredit" else 0.0,
+            "uraian": voucher_uraian,
+        })
+
+    ledger = pd.concat([rows("debet"), rows("kredit")], ignore_index=True)
+    return ledger.sort_values(["no_bukti", "kredit"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+from core.cube import month_index
+from core.neraca import month_label
+from core.rollup import prefix_at_level
+
+# Proporsi digit pertama menurut hukum Benford (digit 1..9)
+BENFORD_EXPECTED = np.log10(1 + 1 / np.arange(1, 10))
+
+
+def _account_groups(bukubesar, level):
+    """
+    Kode integer akun induk (pada `level`) untuk setiap baris, dihitung dari
+    kategori kd_lv_6 (sekali per kategori, bukan per baris).
+    """
+    kd = bukubesar["kd_lv_6"]
+    parents = prefix_at_level(kd.cat.categories, level)
+    labels, parent_codes = np.unique(np.asarray(parents, dtype=object), return_inverse=True)
+    return parent_codes[kd.cat.codes.to_numpy()], pd.Index(labels, name="Kode Akun")
+
+
+def _saldo(bukubesar):
+    return bukubesar["debet"].to_numpy() - bukubesar["kredit"].to_numpy()
+
+
+def monthly_variance(bukubesar, level=3):
+    """
+    Saldo per akun x bulan dengan selisih dan persentase perubahan antarbulan
+    (month-over-month), dalam satu kali bincount.
+    """
+    groups, labels = _account_groups(bukubesar, level)
+    months = month_index(bukubesar["tgl_transaksi"])
+    first = months.min() if len(months) else 0
+    n_months = int(months.max() - first + 1) if len(months) else 0
+    matrix = np.bincount(
+        groups * n_months + (months - first),
+        weights=_saldo(bukubesar),
+        minlength=len(labels) * n_months,
+    ).reshape(len(labels), n_months)
+
+    columns = [month_label(first + i) for i in range(n_months)]
+    saldo = pd.DataFrame(matrix, index=labels, columns=columns)
+    saldo = saldo.loc[(matrix != 0).any(axis=1)]
+
+    long = saldo.stack().rename("Saldo").reset_index().rename(columns={"level_1": "Bulan"})
+    long.columns = ["Kode Akun", "Bulan", "Saldo"]
+    previous = long.groupby("Kode Akun")["Saldo"].shift(1)
+    long["Selisih"] = long["Saldo"] - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        long["Perubahan (%)"] = np.where(previous != 0, long["Selisih"] / previous.abs() * 100, np.nan)
+    return long
+
+
+def unit_variance(bukubesar, level=3):
+    """
+    Saldo per akun x SKPD dibandingkan dengan median antar-SKPD untuk akun yang sama.
+    """
+    groups, labels = _account_groups(bukubesar, level)
+    units = bukubesar["nm_unit"]
+    n_units = len(units.cat.categories)
+    matrix = np.bincount(
+        groups * n_units + units.cat.codes.to_numpy(),
+        weights=_saldo(bukubesar),
+        minlength=len(labels) * n_units,
+    ).reshape(len(labels), n_units)
+    present = np.bincount(
+        groups * n_units + units.cat.codes.to_numpy(), minlength=len(labels) * n_units
+    ).reshape(len(labels), n_units) > 0
+
+    # Median hanya dari SKPD yang memiliki transaksi pada akun tersebut
+    masked = np.where(present, matrix, np.nan)
+    with np.errstate(all="ignore"):
+        median = np.nanmedian(masked, axis=1)
+    acc_idx, unit_idx = np.nonzero(present)
+    result = pd.DataFrame({
+        "Kode Akun": labels[acc_idx],
+        "SKPD": units.cat.categories[unit_idx],
+        "Saldo": matrix[acc_idx, unit_idx],
+        "Median SKPD": median[acc_idx],
+    })
+    result["Selisih dari Median"] = result["Saldo"] - result["Median SKPD"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["Selisih (%)"] = np.where(
+            result["Median SKPD"] != 0,
+            result["Selisih dari Median"] / result["Median SKPD"].abs() * 100,
+            np.nan,
+        )
+    return result
+
+
+def first_digits(values):
+    """
+    Digit pertama (1..9) dari nilai positif; nilai <= 0 diabaikan.
+    """
+    values = np.asarray(values, dtype="float64")
+    values = values[values >= 1]
+    return (values / 10 ** np.floor(np.log10(values))).astype(int).clip(1, 9)
+
+
+def benford_test(values):
+    """
+    Uji digit pertama Benford: tabel proporsi aktual vs harapan, chi-square
+    dan MAD (Mean Absolute Deviation, batas kesesuaian Nigrini: <= 0.015).
+    """
+    digits = first_digits(values)
+    n = len(digits)
+    counts = np.bincount(digits, minlength=10)[1:]
+    actual = counts / n if n else np.zeros(9)
+    expected_counts = BENFORD_EXPECTED * n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chi_square = float(np.nansum((counts - expected_counts) ** 2 / expected_counts)) if n else 0.0
+    mad = float(np.abs(actual - BENFORD_EXPECTED).mean())
+    table = pd.DataFrame({
+        "Digit": np.arange(1, 10),
+        "Jumlah": counts,
+        "Aktual": actual,
+        "Benford": BENFORD_EXPECTED,
+        "Selisih": actual - BENFORD_EXPECTED,
+    })
+    return table, {"n": n, "chi_square": chi_square, "mad": mad}
+
+
+def _group_ids(bukubesar):
+    """
+    Id kelompok kd_lv_6 x nm_unit untuk setiap baris.
+    """
+    n_units = len(bukubesar["nm_unit"].cat.categories)
+    combined = (bukubesar["kd_lv_6"].cat.codes.to_numpy().astype("int64") * n_units
+                + bukubesar["nm_unit"].cat.codes.to_numpy())
+    _, gid = np.unique(combined, return_inverse=True)
+    return gid
+
+
+def _group_quantiles(values, gid, quantiles):
+    """
+    Kuantil (interpolasi linear) per kelompok dengan satu kali pengurutan.
+    """
+    order = np.lexsort((values, gid))
+    ordered = values[order]
+    counts = np.bincount(gid)
+    starts = np.cumsum(counts) - counts
+    result = []
+    for q in quantiles:
+        pos = starts + q * (counts - 1)
+        lo = np.floor(pos).astype("int64")
+        hi = np.ceil(pos).astype("int64")
+        result.append(ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo))
+    return result
+
+
+def _transaction_values(bukubesar):
+    return bukubesar["debet"].to_numpy() + bukubesar["kredit"].to_numpy()
+
+
+def outlier_stats(bukubesar, method="zscore"):
+    """
+    Statistik per kelompok kd_lv_6 x nm_unit untuk deteksi pencilan: rata-rata
+    dan simpangan baku ("zscore") atau Q1 dan Q3 ("iqr"). Tidak bergantung
+    ambang, sehingga cukup dihitung sekali per metode.
+    """
+    if method not in ("zscore", "iqr"):
+        raise ValueError(f"Metode pencilan tidak dikenal: {method}")
+    values = _transaction_values(bukubesar)
+    if len(values) == 0:
+        return {"method": method, "gid": np.empty(0, dtype="int64")}
+    gid = _group_ids(bukubesar)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "zscore":
+            counts = np.bincount(gid)
+            mean = np.bincount(gid, weights=values) / counts
+            var = np.bincount(gid, weights=(values - mean[gid]) ** 2) / (counts - 1)
+            return {"method": method, "gid": gid, "mean": mean, "std": np.sqrt(var)}
+        q1, q3 = _group_quantiles(values, gid, (0.25, 0.75))
+        return {"method": method, "gid": gid, "q1": q1, "q3": q3}
+
+
+def flag_outliers(bukubesar, stats, threshold):
+    """
+    Terapkan ambang pada statistik kelompok dari `outlier_stats`: |z| > threshold
+    atau di luar Q1 - threshold*IQR .. Q3 + threshold*IQR (IQR nol: semua nilai
+    di luar Q1 .. Q3).
+    """
+    values = _transaction_values(bukubesar)
+    if len(values) == 0:
+        return bukubesar.assign(Nilai=[], Skor=[])
+    gid = stats["gid"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if stats["method"] == "zscore":
+            score = (values - stats["mean"][gid]) / stats["std"][gid]
+            flagged = np.abs(score) > threshold
+        else:
+            q1, q3 = stats["q1"][gid], stats["q3"][gid]
+            iqr = q3 - q1
+            lower, upper = q1 - threshold * iqr, q3 + threshold * iqr
+            flagged = (values < lower) | (values > upper)
+            # IQR nol (nilai berulang, mis. honorarium tetap): skor = selisih dalam
+            # rupiah, sehingga tetap terhingga dan berada di urutan teratas
+            scale = np.maximum(iqr, 1.0)
+            score = np.where(values > upper, (values - q3) / scale, (q1 - values) / scale)
+
+    flagged &= np.isfinite(score)
+    result = bukubesar[flagged].assign(Nilai=values[flagged], Skor=score[flagged])
+    return result.sort_values("Skor", key=np.abs, ascending=False)
+
+
+def outliers(bukubesar, method="zscore", threshold=3.0):
+    """
+    Tandai transaksi pencilan per kelompok kd_lv_6 x nm_unit berdasarkan nilai
+    transaksi (debet + kredit). `method`: "zscore" (|z| > threshold) atau
+    "iqr" (di luar Q1 - threshold*IQR .. Q3 + threshold*IQR).
+    """
+    return flag_outliers(bukubesar, outlier_stats(bukubesar, method), threshold)
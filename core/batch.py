@@ -0,0 +1,120 @@
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from core.export import write_report_sheet
+from core.rollup import lra_accounts, lra_from_leaf_balances
+
+_INVALID_NAME = re.compile(r'[\[\]:*?/\\<>|"]')
+
+
+def safe_name(name, max_len=None):
+    """
+    Nama unit yang aman dipakai sebagai nama file / nama sheet Excel.
+    """
+    name = _INVALID_NAME.sub("_", str(name)).strip() or "Tanpa Nama"
+    return name[:max_len] if max_len else name
+
+
+def unique_names(units, name_func):
+    """
+    Nama unik per unit (tanpa membedakan huruf besar/kecil), diberikan berurutan
+    menurut nama unit. `name_func(unit, suffix)` membentuk nama; `suffix` None
+    untuk percobaan pertama, lalu 2, 3, ... bila nama sudah dipakai.
+    """
+    names, used = {}, set()
+    for unit in sorted(units):
+        name, suffix = name_func(unit, None), 1
+        while name.lower() in used:
+            suffix += 1
+            name = name_func(unit, suffix)
+        used.add(name.lower())
+        names[unit] = name
+    return names
+
+
+def _file_name(unit, suffix):
+    return f"LRA_{safe_name(unit)}{'' if suffix is None else f'_{suffix}'}.xlsx"
+
+
+def _sheet_name(unit, suffix):
+    return safe_name(unit, 31) if suffix is None else f"{safe_name(unit, 27)}_{suffix}"
+
+
+def unit_leaf_balances(bukubesar, exclude_jenis=("Jurnal Penutup",)):
+    """
+    Partisi buku besar per SKPD dalam satu kali groupby: saldo (debet - kredit)
+    per nm_unit x kd_lv_6.
+    """
+    df = bukubesar
+    if exclude_jenis:
+        df = df[~df["jns_transaksi"].isin(exclude_jenis)]
+    saldo = (df["debet"] - df["kredit"]).groupby(
+        [df["nm_unit"], df["kd_lv_6"]], observed=True
+    ).sum()
+    return {
+        str(unit): part.droplevel(0).rename(index=str)
+        for unit, part in saldo.groupby(level=0, observed=True)
+    }
+
+
+def _unit_lra_job(unit, leaf_saldo, accounts, path):
+    """
+    Dijalankan di proses pekerja: hitung LRA satu unit dan (opsional) tulis workbook-nya ke `path`.
+    """
+    lra = lra_from_leaf_balances(leaf_saldo, accounts)
+    if path is None:
+        return unit, lra, None
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        write_report_sheet(writer, lra, "LRA")
+    return unit, None, path
+
+
+def generate_unit_lras(bukubesar, coa, out_dir, single_workbook=False, max_workers=None, progress=None):
+    """
+    Buat LRA untuk setiap nm_unit secara paralel (process pool) lalu kemas
+    dalam satu file zip. Dengan `single_workbook=True` semua unit ditulis sebagai
+    sheet dalam satu workbook. Kembalikan path file zip.
+
+    `progress(selesai, total)` dipanggil setiap satu unit selesai.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    partitions = unit_leaf_balances(bukubesar)
+    accounts = lra_accounts(coa)
+    total = len(partitions)
+
+    # Unit yang namanya sama setelah disanitasi (mis. "A/B" dan "A_B") diberi akhiran
+    names = unique_names(partitions, _sheet_name if single_workbook else _file_name)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(_unit_lra_job, unit, saldo, accounts, None if single_workbook else out_dir / names[unit])
+            for unit, saldo in partitions.items()
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            unit, lra, path = future.result()
+            results[unit] = lra if single_workbook else path
+            if progress is not None:
+                progress(done, total)
+
+    files = []
+    if single_workbook:
+        path = out_dir / "LRA_per_SKPD.xlsx"
+        with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+            for unit in sorted(results):
+                write_report_sheet(writer, results[unit], names[unit])
+        files.append(path)
+    else:
+        files.extend(results[unit] for unit in sorted(results))
+
+    zip_path = out_dir / "LRA_per_SKPD.zip"
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for path in files:
+            zf.write(path, arcname=Path(path).name)
+    return zip_path
@@ -0,0 +1,198 @@
+"""
+Antarmuka baris perintah untuk laporan tanpa Streamlit, misalnya untuk
+pra-pembuatan laporan malam hari lewat cron:
+
+    python -m core.cli lra --ledger data/bukubesar.xlsb --unit "Dinas X" --output LRA.xlsx
+    python -m core.cli ledger --account 5.1.02 --start 2024-01-01 --end 2024-03-31 --output bb.csv
+    python -m core.cli batch-lra --output-dir laporan/ --single-workbook
+    python -m core.cli lo --output LO.xlsx
+    python -m core.cli neraca --month 2024-06 --output Neraca.xlsx
+    python -m core.cli trial-balance --level 3 --output neraca_saldo.xlsx
+    python -m core.cli check --output temuan.xlsx
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.batch import generate_unit_lras
+from core.export import export_to_path, write_report
+from core.integrity import check_ledger, issue_summary
+from core.ledger import run_query, with_account_names
+from core.neraca import NeracaEngine, build_neraca
+from core.registry import BUKUBESAR_PATH, COA_PATH, open_dataset
+from core.rollup import StatementRollup, leaf_balances
+from core.trial_balance import VALUES, TrialBalance
+
+LEDGER_COLUMNS = [
+    "no_bukti", "tgl_transaksi", "jns_transaksi", "nm_unit",
+    "kd_lv_6", "Nama Akun 6", "debet", "kredit", "uraian",
+]
+
+
+def _log(message):
+    print(message, file=sys.stderr)
+
+
+def _open(args):
+    started = time.perf_counter()
+    dataset = open_dataset(args.ledger, args.coa, include_delta=not args.no_delta)
+    _log(f"Data dimuat: {len(dataset.bukubesar):,} baris ({time.perf_counter() - started:.1f} dtk)")
+    return dataset
+
+
+def _unit_rows(bukubesar, unit):
+    if unit is None:
+        return bukubesar
+    rows = bukubesar[(bukubesar["nm_unit"] == unit).to_numpy()]
+    if rows.empty:
+        raise SystemExit(f"Unit tidak ditemukan: {unit}")
+    return rows
+
+
+def cmd_statement(args):
+    dataset = _open(args)
+    if args.unit is None:
+        leaf_saldo = dataset.cube.leaf_balances()
+    else:
+        leaf_saldo = leaf_balances(_unit_rows(dataset.bukubesar, args.unit))
+    report = StatementRollup(leaf_saldo, dataset.coa).statement(args.laporan, args.level)
+    write_report(report, args.output, args.laporan)
+    _log(f"{args.laporan} ditulis ke {args.output}")
+
+
+def cmd_neraca(args):
+    dataset = _open(args)
+    engine = NeracaEngine(_unit_rows(dataset.bukubesar, args.unit))
+    neraca = build_neraca(engine, dataset.coa, args.month, args.level)
+    write_report(neraca, args.output, "Neraca")
+    _log(f"Neraca ditulis ke {args.output}")
+
+
+def cmd_ledger(args):
+    dataset = _open(args)
+    periode = None
+    if args.start or args.end:
+        dates = dataset.bukubesar["tgl_transaksi"]
+        periode = (args.start or dates.min(), args.end or dates.max())
+    filter_args = dict(
+        kode_akun=args.account,
+        jenis_transaksi=args.jenis,
+        unit=args.unit,
+        tipe=args.tipe,
+        periode=periode,
+        kata_kunci=args.keyword,
+    )
+    result = run_query(dataset.bukubesar, filter_args)
+    positions = np.sort(result["positions"])
+    rows = with_account_names(dataset.bukubesar.iloc[positions], dataset.coa_index.names)
+    export_to_path(rows[LEDGER_COLUMNS], args.output)
+    _log(
+        f"{len(positions):,} baris ditulis ke {args.output} "
+        f"(debet {result['debet']:,.0f}, kredit {result['kredit']:,.0f})"
+    )
+
+
+def cmd_trial_balance(args):
+    dataset = _open(args)
+    exclude = [] if args.include_closing else ["Jurnal Penutup"]
+    tb = TrialBalance.from_cube(dataset.cube, exclude).rollup(args.level)
+    if args.long:
+        table = tb.long(names=dataset.coa_index.names)
+    else:
+        table = tb.pivot(args.value, names=dataset.coa_index.names)
+    export_to_path(table, args.output)
+    _log(f"Neraca saldo {len(tb.accounts):,} akun x {len(tb.units):,} unit ditulis ke {args.output}")
+
+
+def cmd_check(args):
+    dataset = _open(args)
+    issues = check_ledger(dataset.bukubesar, dataset.coa_index, dataset.rejected, args.tolerance)
+    summary = issue_summary(issues)
+    with pd.ExcelWriter(args.output, engine="xlsxwriter") as writer:
+        summary.to_excel(writer, sheet_name="Ringkasan", index=False)
+        for key, frame in issues.items():
+            if len(frame):
+                frame.to_excel(writer, sheet_name=key[:31], index=False)
+    for title, count in zip(summary["Pemeriksaan"], summary["Temuan"]):
+        _log(f"{title}: {count:,}")
+    _log(f"Temuan ditulis ke {args.output}")
+
+
+def cmd_batch_lra(args):
+    dataset = _open(args)
+    zip_path = generate_unit_lras(
+        dataset.bukubesar,
+        dataset.coa,
+        args.output_dir,
+        single_workbook=args.single_workbook,
+        max_workers=args.workers,
+        progress=lambda done, total: _log(f"{done}/{total} unit selesai"),
+    )
+    _log(f"LRA per unit dikemas di {zip_path}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.cli", description="Laporan keuangan tanpa antarmuka Streamlit"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, func, help_text):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--ledger", default=BUKUBESAR_PATH, help="File buku besar (xlsb/xlsx/csv/parquet)")
+        cmd.add_argument("--coa", default=COA_PATH, help="File bagan akun (COA)")
+        cmd.add_argument("--no-delta", action="store_true", help="Abaikan posting bulanan yang sudah diunggah")
+        cmd.set_defaults(func=func)
+        return cmd
+
+    for laporan, help_text in (("LRA", "Laporan Realisasi Anggaran"), ("LO", "Laporan Operasional")):
+        statement = add_command(laporan.lower(), cmd_statement, help_text)
+        statement.add_argument("--unit", help="nm_unit (SKPD); kosong berarti konsolidasi")
+        statement.add_argument("--level", type=int, default=3, help="Level rincian akun")
+        statement.add_argument("--output", required=True, help="File xlsx tujuan")
+        statement.set_defaults(laporan=laporan)
+
+    neraca = add_command("neraca", cmd_neraca, "Neraca per akhir bulan")
+    neraca.add_argument("--unit", help="nm_unit (SKPD); kosong berarti konsolidasi")
+    neraca.add_argument("--month", help="Bulan laporan YYYY-MM; kosong berarti bulan terakhir")
+    neraca.add_argument("--level", type=int, default=3, help="Level rincian akun")
+    neraca.add_argument("--output", required=True, help="File xlsx tujuan")
+
+    ledger = add_command("ledger", cmd_ledger, "Dump buku besar hasil filter")
+    ledger.add_argument("--account", help="Kode akun level berapa pun (mis. 5.1.02)")
+    ledger.add_argument("--jenis", nargs="+", help="Jenis transaksi")
+    ledger.add_argument("--unit", help="nm_unit (SKPD)")
+    ledger.add_argument("--tipe", choices=["All", "Debet", "Kredit"], default="All")
+    ledger.add_argument("--start", help="Tanggal awal YYYY-MM-DD")
+    ledger.add_argument("--end", help="Tanggal akhir YYYY-MM-DD")
+    ledger.add_argument("--keyword", help="Kata kunci uraian")
+    ledger.add_argument("--output", required=True, help="File tujuan (.xlsx, .csv atau .parquet)")
+
+    trial = add_command("trial-balance", cmd_trial_balance, "Neraca saldo akun x unit (pivot)")
+    trial.add_argument("--level", type=int, default=6, help="Level akun COA (1-6)")
+    trial.add_argument("--value", choices=list(VALUES), default="saldo", help="Nilai pivot")
+    trial.add_argument("--long", action="store_true", help="Bentuk panjang (akun, unit, debet, kredit, saldo)")
+    trial.add_argument("--include-closing", action="store_true", help="Ikutkan Jurnal Penutup")
+    trial.add_argument("--output", required=True, help="File tujuan (.xlsx, .csv atau .parquet)")
+
+    check = add_command("check", cmd_check, "Pemeriksaan integritas buku besar")
+    check.add_argument("--tolerance", type=float, default=0.5, help="Selisih debet-kredit yang diabaikan")
+    check.add_argument("--output", required=True, help="File xlsx tujuan")
+
+    batch = add_command("batch-lra", cmd_batch_lra, "LRA untuk semua unit (zip)")
+    batch.add_argument("--output-dir", required=True, help="Folder tujuan")
+    batch.add_argument("--single-workbook", action="store_true", help="Satu workbook, satu sheet per unit")
+    batch.add_argument("--workers", type=int, help="Jumlah proses pekerja")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+MAX_LEVEL = 6
+
+
+def code_sort_key(codes):
+    """
+    Kunci urut hierarkis untuk kode akun ("5.1.02" -> (5, 1, 2)).
+    """
+    return codes.map(lambda kode: tuple(int(p) for p in str(kode).split(".") if p.isdigit()))
+
+
+def coa_accounts(coa):
+    """
+    Ubah COA denormalisasi (Kode Akun 1..6 / Nama Akun 1..6) menjadi daftar akun
+    unik per level dengan kolom "Kode Akun", "Nama Akun", "Level" dan "Laporan".
+    """
+    frames = []
+    for level in range(1, MAX_LEVEL + 1):
+        kode_col, nama_col = f"Kode Akun {level}", f"Nama Akun {level}"
+        if kode_col not in coa.columns or nama_col not in coa.columns:
+            continue
+        part = coa[["Laporan", kode_col, nama_col]].dropna(subset=[kode_col])
+        part = part.drop_duplicates(subset=[kode_col]).rename(
+            columns={kode_col: "Kode Akun", nama_col: "Nama Akun"}
+        )
+        part["Level"] = level
+        frames.append(part)
+    accounts = pd.concat(frames, ignore_index=True)
+    return accounts[["Kode Akun", "Nama Akun", "Level", "Laporan"]]
+
+
+def prefix_range(sorted_codes, kode):
+    """
+    Interval [lo, hi) pada array kode terurut (leksikografis) yang berawalan
+    `kode` sebagai segmen utuh: "5.1" mencakup "5.1" dan "5.1.xx", bukan "5.10".
+    """
+    # "/" tepat setelah "." dan sebelum "0", sehingga rentang berhenti sebelum "5.10"
+    lo = int(np.searchsorted(sorted_codes, kode, side="left"))
+    hi = int(np.searchsorted(sorted_codes, kode + "/", side="left"))
+    return lo, hi
+
+
+class CoaIndex:
+    """
+    Pohon akun COA yang dikompilasi sekali per versi COA: peta induk -> anak,
+    kode -> nama, kode -> level, dan daftar kode daun (kd_lv_6) terurut.
+    """
+
+    def __init__(self, coa):
+        accounts = coa_accounts(coa)
+        accounts = accounts.iloc[code_sort_key(accounts["Kode Akun"]).argsort()]
+
+        self.names = dict(zip(accounts["Kode Akun"], accounts["Nama Akun"]))
+        self.levels = dict(zip(accounts["Kode Akun"], accounts["Level"]))
+
+        # Peta induk -> anak (urut hierarkis); akar ("") berisi akun level 1
+        self.children = {}
+        for kode, level in zip(accounts["Kode Akun"], accounts["Level"]):
+            parent = kode.rsplit(".", 1)[0] if level > 1 else ""
+            self.children.setdefault(parent, []).append(kode)
+
+        # Daun terurut leksikografis (pencarian akun di luar COA)
+        self.leaf_codes = np.sort(accounts.loc[accounts["Level"] == MAX_LEVEL, "Kode Akun"].to_numpy(dtype=object))
+
+    def level_codes(self, level):
+        return [kode for kode, lv in self.levels.items() if lv == level]
+
+    def name(self, kode, default=None):
+        return self.names.get(kode, default)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from core.coa import prefix_range
+
+
+def month_index(tanggal):
+    """
+    Bulan transaksi sebagai bilangan bulat (bulan sejak 1970-01).
+    """
+    return tanggal.to_numpy().astype("datetime64[M]").astype("int64")
+
+
+class LedgerCube:
+    """
+    Agregat buku besar yang dimaterialisasi saat dimuat: jumlah debet, kredit
+    dan banyak baris per kd_lv_6 x nm_unit x jns_transaksi x bulan x sisi
+    (baris debet / baris kredit). Cube diurutkan menurut kode kd_lv_6 sehingga
+    saldo akun pada level COA mana pun adalah satu irisan (searchsorted).
+    """
+
+    KEYS = ["akun", "unit", "jenis", "bulan", "is_debet", "is_kredit"]
+
+    def __init__(self, bukubesar):
+        self._set(
+            self._aggregate(bukubesar),
+            bukubesar["kd_lv_6"].cat.categories,
+            bukubesar["nm_unit"].cat.categories,
+            bukubesar["jns_transaksi"].cat.categories,
+        )
+
+    def _set(self, frame, accounts, units, jenis):
+        self.accounts = pd.Index(accounts).to_numpy(dtype=object)
+        self.units = pd.Index(units)
+        self.jenis = pd.Index(jenis)
+        self.frame = frame
+        self._akun = self.frame["akun"].to_numpy()
+
+    @classmethod
+    def _aggregate(cls, bukubesar):
+        keys = pd.DataFrame({
+            "akun": bukubesar["kd_lv_6"].cat.codes.to_numpy(),
+            "unit": bukubesar["nm_unit"].cat.codes.to_numpy(),
+            "jenis": bukubesar["jns_transaksi"].cat.codes.to_numpy(),
+            "bulan": month_index(bukubesar["tgl_transaksi"]),
+            "is_debet": bukubesar["debet"].to_numpy() > 0,
+            "is_kredit": bukubesar["kredit"].to_numpy() > 0,
+            "debet": bukubesar["debet"].to_numpy(),
+            "kredit": bukubesar["kredit"].to_numpy(),
+        })
+        cube = keys.groupby(cls.KEYS, sort=True).agg(
+            debet=("debet", "sum"), kredit=("kredit", "sum"), jumlah=("debet", "size")
+        )
+        return cube.reset_index()
+
+    def extended(self, delta):
+        """
+        Cube baru = cube ini + agregat baris `delta`. Kode kategori lama dipetakan
+        ke kategori `delta` (gabungan), sehingga biaya sebanding dengan ukuran
+        cube dan baris baru, bukan seluruh buku besar.
+        """
+        accounts = delta["kd_lv_6"].cat.categories
+        units = delta["nm_unit"].cat.categories
+        jenis = delta["jns_transaksi"].cat.categories
+        old = self.frame.assign(
+            akun=accounts.get_indexer(self.accounts)[self.frame["akun"].to_numpy()],
+            unit=units.get_indexer(self.units)[self.frame["unit"].to_numpy()],
+            jenis=jenis.get_indexer(self.jenis)[self.frame["jenis"].to_numpy()],
+        )
+        frame = pd.concat([old, self._aggregate(delta)], ignore_index=True)
+        frame = frame.groupby(self.KEYS, sort=True)[["debet", "kredit", "jumlah"]].sum().reset_index()
+        cube = LedgerCube.__new__(LedgerCube)
+        cube._set(frame, accounts, units, jenis)
+        return cube
+
+    def _slice(self, kode_akun):
+        if not kode_akun:
+            return self.frame
+        lo, hi = prefix_range(self.accounts, kode_akun)
+        start, stop = np.searchsorted(self._akun, [lo, hi], side="left")
+        return self.frame.iloc[start:stop]
+
+    def leaf_balances(self, exclude_jenis=("Jurnal Penutup",)):
+        """
+        Saldo (debet - kredit) per kd_lv_6 dari cube, setara dengan
+        `core.rollup.leaf_balances` tanpa memindai baris buku besar.
+        """
+        akun = self._akun
+        keep = np.ones(len(akun), dtype=bool)
+        if exclude_jenis:
+            excluded = self.jenis.get_indexer(list(exclude_jenis))
+            keep &= ~np.isin(self.frame["jenis"].to_numpy(), excluded[excluded >= 0])
+        amount = self.frame["debet"].to_numpy() - self.frame["kredit"].to_numpy()
+        saldo = np.bincount(akun[keep], weights=amount[keep], minlength=len(self.accounts))
+        observed = np.bincount(akun[keep], minlength=len(self.accounts)) > 0
+        return pd.Series(saldo[observed], index=pd.Index(self.accounts[observed].astype(str)))
+
+    def query(self, kode_akun=None, jenis_transaksi=None, unit=None, tipe="All", bulan=None):
+        """
+        Jumlah debet, kredit, saldo dan banyak baris untuk kombinasi filter.
+        `bulan` berisi periode bulanan ("2024-03", pd.Period, dsb.).
+        """
+        part = self._slice(kode_akun)
+        mask = np.ones(len(part), dtype=bool)
+        if jenis_transaksi:
+            codes = self.jenis.get_indexer(list(jenis_transaksi))
+            mask &= np.isin(part["jenis"].to_numpy(), codes[codes >= 0])
+        if unit:
+            mask &= part["unit"].to_numpy() == self.units.get_indexer([unit])[0]
+        if tipe == "Debet":
+            mask &= part["is_debet"].to_numpy()
+        elif tipe == "Kredit":
+            mask &= part["is_kredit"].to_numpy()
+        if bulan is not None:
+            wanted = [np.datetime64(str(b), "M").astype("int64") for b in bulan]
+            mask &= np.isin(part["bulan"].to_numpy(), wanted)
+        part = part[mask]
+        debet = float(part["debet"].sum())
+        kredit = float(part["kredit"].sum())
+        return {
+            "debet": debet,
+            "kredit": kredit,
+            "saldo": debet - kredit,
+            "jumlah": int(part["jumlah"].sum()),
+        }
@@ -0,0 +1,181 @@
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+# Format unduhan: ekstensi file dan MIME type
+EXPORT_FORMATS = {
+    "Excel (xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# Batas baris satu worksheet Excel (termasuk baris header)
+XLSX_MAX_ROWS = 1_048_576
+
+# File unduhan sementara (ekspor, batch LRA) ditulis ke satu folder milik aplikasi
+TEMP_DIR = Path(tempfile.gettempdir()) / "bukubesar_app"
+TEMP_MAX_AGE = 6 * 3600  # detik
+
+
+def _column_kind(dtype):
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "date"
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return "number"
+    return "string"
+
+
+def _column_values(values, kind):
+    """
+    Nilai kolom sebagai array object, dengan None untuk sel kosong.
+    """
+    valid = values.notna().to_numpy()
+    if kind == "date":
+        out = np.array(values.dt.to_pydatetime(), dtype=object)
+    elif kind == "number":
+        out = values.to_numpy(dtype="float64").astype(object)
+    else:
+        out = np.array(values.astype(str), dtype=object)
+    out[~valid] = None
+    return out
+
+
+def write_xlsx_streaming(df, path, sheet_name="Sheet1", chunk_size=50_000, max_rows=XLSX_MAX_ROWS):
+    """
+    Tulis DataFrame ke xlsx dalam mode constant_memory xlsxwriter: baris
+    ditulis berurutan dan langsung di-flush ke disk, tanpa salinan workbook di RAM.
+    Bila baris melebihi batas Excel (`max_rows` termasuk header), penulisan
+    berlanjut di sheet baru ("Sheet1 (2)", dst.) dengan header yang sama.
+    """
+    # nan_inf_to_errors: nilai +/-inf ditulis sebagai sel error (#DIV/0!), bukan exception
+    workbook = xlsxwriter.Workbook(str(path), {"constant_memory": True, "nan_inf_to_errors": True})
+    date_format = workbook.add_format({"num_format": "dd/mm/yyyy"})
+    columns = list(df.columns)
+    kinds = [_column_kind(df[col].dtype) for col in columns]
+
+    def new_sheet(number):
+        name = sheet_name[:31] if number == 1 else f"{sheet_name[:25]} ({number})"
+        worksheet = workbook.add_worksheet(name)
+        worksheet.write_row(0, 0, columns)
+        # Fungsi tulis dipilih per kolom sekali saja (lebih cepat dari worksheet.write generik)
+        writers = []
+        for kind in kinds:
+            if kind == "date":
+                writers.append(lambda r, c, v, ws=worksheet: ws.write_datetime(r, c, v, date_format))
+            elif kind == "number":
+                writers.append(worksheet.write_number)
+            else:
+                writers.append(worksheet.write_string)
+        return writers
+
+    sheet_num = 1
+    writers = new_sheet(sheet_num)
+    row_num = 1
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        arrays = [_column_values(chunk[col], kind) for col, kind in zip(columns, kinds)]
+        for values in zip(*arrays):
+            if row_num >= max_rows:
+                sheet_num += 1
+                writers = new_sheet(sheet_num)
+                row_num = 1
+            for col_num, value in enumerate(values):
+                if value is not None:
+                    writers[col_num](row_num, col_num, value)
+            row_num += 1
+    workbook.close()
+
+
+def write_report_sheet(writer, report, sheet_name):
+    """
+    Tulis laporan (Kode Rek, Uraian, Saldo) ke satu sheet pd.ExcelWriter
+    (engine xlsxwriter) dengan format angka ribuan.
+    """
+    report.to_excel(writer, sheet_name=sheet_name, index=False)
+    worksheet = writer.sheets[sheet_name]
+    money = writer.book.add_format({"num_format": "#,##0"})
+    worksheet.set_column(0, 0, 14)
+    worksheet.set_column(1, 1, 60)
+    worksheet.set_column(2, len(report.columns) - 1, 22, money)
+
+
+def write_report(report, path, sheet_name="Laporan"):
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        write_report_sheet(writer, report, sheet_name)
+
+
+def write_csv(df, path, chunk_size=100_000):
+    df.to_csv(path, index=False, chunksize=chunk_size)
+
+
+def write_parquet(df, path):
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
+_WRITERS = {
+    "xlsx": write_xlsx_streaming,
+    "csv": write_csv,
+    "parquet": write_parquet,
+}
+
+
+def export_format_for(path):
+    """
+    Kunci EXPORT_FORMATS berdasarkan ekstensi file tujuan.
+    """
+    ext = Path(path).suffix.lstrip(".").lower()
+    for fmt, (fmt_ext, _) in EXPORT_FORMATS.items():
+        if fmt_ext == ext:
+            return fmt
+    raise ValueError(f"Format file tidak didukung: .{ext} (pilih xlsx, csv atau parquet)")
+
+
+def export_to_path(df, path):
+    """
+    Ekspor DataFrame ke `path`; format mengikuti ekstensi file.
+    """
+    ext, _ = EXPORT_FORMATS[export_format_for(path)]
+    _WRITERS[ext](df, str(path))
+    return path
+
+
+def app_temp_dir(max_age=TEMP_MAX_AGE):
+    """
+    Folder sementara aplikasi (TEMP_DIR). File dan folder di dalamnya yang
+    lebih tua dari `max_age` detik dihapus setiap kali folder ini diminta.
+    """
+    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    cutoff = time.time() - max_age
+    for entry in TEMP_DIR.iterdir():
+        try:
+            if entry.stat().st_mtime >= cutoff:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+        except OSError:
+            # Sudah dihapus atau sedang dipakai proses lain
+            pass
+    return TEMP_DIR
+
+
+def export_to_file(df, fmt, directory=None):
+    """
+    Ekspor DataFrame ke file sementara dalam format `fmt` (kunci EXPORT_FORMATS)
+    dan kembalikan path-nya. File ditulis langsung ke disk, bukan ke BytesIO;
+    tanpa `directory` file masuk ke folder sementara aplikasi.
+    """
+    ext, _ = EXPORT_FORMATS[fmt]
+    fd, path = tempfile.mkstemp(suffix=f".{ext}", dir=directory or app_temp_dir())
+    os.close(fd)
+    _WRITERS[ext](df, path)
+    return path
@@ -0,0 +1,123 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.ledger import CATEGORICAL_COLUMNS, prepare_bukubesar
+from core.snapshot import CACHE_DIR, read_bukubesar_xlsb
+
+# Posting bulanan tambahan disimpan per sidik jari buku besar dasar
+DELTA_DIR = CACHE_DIR / "delta"
+
+
+class DeltaStore:
+    """
+    Kumpulan file Parquet berisi posting baru yang ditambahkan di atas buku
+    besar dasar (bukubesar.xlsb). Manifest mencatat urutan bagian dan watermark
+    tgl_transaksi terakhir.
+    """
+
+    def __init__(self, base_fingerprint):
+        self.directory = DELTA_DIR / base_fingerprint
+        self.manifest_path = self.directory / "manifest.json"
+
+    def manifest(self):
+        if not self.manifest_path.exists():
+            return {"parts": []}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def parts(self):
+        return tuple(part["file"] for part in self.manifest()["parts"])
+
+    def load_part(self, name):
+        table = pq.read_table(self.directory / name, memory_map=True)
+        return prepare_bukubesar(table.to_pandas())
+
+    def load_rejected(self, name):
+        """
+        Baris bagian `name` yang ditolak saat ingest (tanggal tidak valid),
+        atau None bila tidak ada.
+        """
+        for part in self.manifest()["parts"]:
+            if part["file"] == name and part.get("rejected"):
+                return pq.read_table(self.directory / part["rejected"]).to_pandas()
+        return None
+
+    def _write(self, frame, name):
+        tmp = self.directory / f"{name}.tmp"
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp)
+        os.replace(tmp, self.directory / name)
+
+    def append(self, delta, source_name="", rejected=None):
+        """
+        Simpan `delta` (sudah dinormalisasi) sebagai bagian baru, beserta baris
+        yang ditolak saat normalisasi (`rejected`, nilai tanggal asli) bila ada.
+        File dan manifest ditulis lewat file sementara lalu di-rename (atomik).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self.manifest()
+        name = f"part-{len(manifest['parts']) + 1:04d}.parquet"
+
+        table_df = delta.copy()
+        for col in CATEGORICAL_COLUMNS:
+            if col in table_df.columns:
+                table_df[col] = table_df[col].astype(str)
+        self._write(table_df, name)
+        entry = {
+            "file": name,
+            "source": str(source_name),
+            "rows": int(len(delta)),
+            "watermark": str(delta["tgl_transaksi"].max().date()) if len(delta) else None,
+        }
+        if rejected is not None and len(rejected):
+            # Nilai mentah bisa bercampur tipe; disimpan sebagai teks untuk laporan temuan
+            entry["rejected"] = name.replace(".parquet", ".rejected.parquet")
+            entry["rejected_rows"] = int(len(rejected))
+            self._write(rejected.astype(str), entry["rejected"])
+
+        manifest["parts"].append(entry)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+        return name
+
+
+def select_new_postings(bukubesar, delta, known_bukti=None):
+    """
+    Pilih posting baru dari `delta`: no_bukti yang belum pernah ada, atau
+    tgl_transaksi setelah watermark (tanggal terakhir di buku besar).
+    Pembandingnya hanya posting yang sudah tersimpan; baris identik di dalam
+    satu bukti (mis. dua baris akun yang sama) tetap dipertahankan.
+    """
+    watermark = bukubesar["tgl_transaksi"].max()
+    if known_bukti is None:
+        known_bukti = pd.Index(bukubesar["no_bukti"].unique())
+    # get_indexer memakai tabel hash indeks yang sudah ada (tidak dibangun ulang per panggilan)
+    is_new = known_bukti.get_indexer(delta["no_bukti"]) < 0
+    if pd.notna(watermark):
+        is_new |= (delta["tgl_transaksi"] > watermark).to_numpy()
+    return delta[is_new].reset_index(drop=True)
+
+
+def select_new_rejected(rejected, stored_rejected=None):
+    """
+    Baris ditolak dari `rejected` yang no_bukti-nya belum tercatat sebagai
+    ditolak, agar unggahan ulang file yang sama tidak menggandakan temuan.
+    """
+    if stored_rejected is None or len(stored_rejected) == 0 or "no_bukti" not in rejected.columns:
+        return rejected
+    known = stored_rejected["no_bukti"].astype(str)
+    return rejected[~rejected["no_bukti"].astype(str).isin(known).to_numpy()].reset_index(drop=True)
+
+
+def read_delta(source, read_func=read_bukubesar_xlsb, return_rejected=False):
+    """
+    Baca file ekspor bulanan dan normalisasi seperti buku besar utama. Dengan
+    `return_rejected=True` kembalikan juga baris bertanggal tidak valid.
+    """
+    return prepare_bukubesar(read_func(Path(source)), return_rejected=return_rejected)
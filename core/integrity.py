@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# Pemeriksaan integritas buku besar -> judul yang ditampilkan
+CHECKS = {
+    "bukti_tidak_seimbang": "No. bukti tidak seimbang (debet != kredit)",
+    "akun_tidak_di_coa": "kd_lv_6 tidak ada di COA",
+    "posting_ganda": "Posting ganda",
+    "tanggal_tidak_valid": "tgl_transaksi tidak bisa dibaca",
+}
+
+# Kolom yang menentukan satu posting; baris dengan nilai sama persis dianggap ganda
+POSTING_COLUMNS = ["no_bukti", "tgl_transaksi", "jns_transaksi", "nm_unit", "kd_lv_6", "debet", "kredit", "uraian"]
+
+
+def unbalanced_vouchers(bukubesar, tolerance=0.5):
+    """
+    No. bukti dengan total debet != total kredit (selisih > `tolerance` rupiah),
+    dihitung dengan satu factorize + bincount.
+    """
+    inverse, bukti = pd.factorize(bukubesar["no_bukti"], use_na_sentinel=False)
+    bukti = np.asarray(bukti, dtype=object)
+    debet = np.bincount(inverse, weights=bukubesar["debet"].to_numpy(), minlength=len(bukti))
+    kredit = np.bincount(inverse, weights=bukubesar["kredit"].to_numpy(), minlength=len(bukti))
+    rows = np.bincount(inverse, minlength=len(bukti))
+    selisih = debet - kredit
+    bad = np.abs(selisih) > tolerance
+    result = pd.DataFrame({
+        "no_bukti": bukti[bad],
+        "baris": rows[bad],
+        "debet": debet[bad],
+        "kredit": kredit[bad],
+        "selisih": selisih[bad],
+    })
+    return result.iloc[np.argsort(-np.abs(result["selisih"].to_numpy()), kind="stable")].reset_index(drop=True)
+
+
+def unmapped_accounts(bukubesar, coa_index):
+    """
+    Anti-join kategori kd_lv_6 terhadap daun COA: kode yang tidak punya nama
+    akun beserta banyak baris dan nilainya.
+    """
+    kd = bukubesar["kd_lv_6"]
+    categories = kd.cat.categories
+    missing = ~categories.isin(coa_index.leaf_codes)
+    if not missing.any():
+        return pd.DataFrame(columns=["kd_lv_6", "baris", "debet", "kredit"])
+    codes = kd.cat.codes.to_numpy()
+    n = len(categories)
+    rows = np.bincount(codes, minlength=n)
+    debet = np.bincount(codes, weights=bukubesar["debet"].to_numpy(), minlength=n)
+    kredit = np.bincount(codes, weights=bukubesar["kredit"].to_numpy(), minlength=n)
+    missing &= rows > 0
+    return pd.DataFrame({
+        "kd_lv_6": np.asarray(categories[missing], dtype=object),
+        "baris": rows[missing],
+        "debet": debet[missing],
+        "kredit": kredit[missing],
+    })
+
+
+def duplicate_postings(bukubesar, columns=POSTING_COLUMNS):
+    """
+    Baris posting yang muncul lebih dari sekali (semua kolom posting sama).
+    Baris di-hash per kolom lalu dihitung kemunculannya.
+    """
+    columns = [col for col in columns if col in bukubesar.columns]
+    hashes = pd.util.hash_pandas_object(bukubesar[columns], index=False).to_numpy()
+    _, inverse, counts = np.unique(hashes, return_inverse=True, return_counts=True)
+    positions = np.flatnonzero(counts[inverse] > 1)
+    result = bukubesar.iloc[positions][columns].assign(kemunculan=counts[inverse][positions])
+    return result.sort_values(["no_bukti", "kd_lv_6"], kind="stable").reset_index(drop=True)
+
+
+def check_ledger(bukubesar, coa_index, rejected=None, tolerance=0.5):
+    """
+    Jalankan semua pemeriksaan; hasil: kunci CHECKS -> DataFrame temuan.
+    """
+    return {
+        "bukti_tidak_seimbang": unbalanced_vouchers(bukubesar, tolerance),
+        "akun_tidak_di_coa": unmapped_accounts(bukubesar, coa_index),
+        "posting_ganda": duplicate_postings(bukubesar),
+        "tanggal_tidak_valid": rejected if rejected is not None else pd.DataFrame(),
+    }
+
+
+def issue_summary(issues):
+    return pd.DataFrame({
+        "Pemeriksaan": [CHECKS[key] for key in issues],
+        "Temuan": [len(frame) for frame in issues.values()],
+    })
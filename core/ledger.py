@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+from core.coa import prefix_range
+from core.search import keyword_mask
+
+# Kolom teks berulang disimpan sebagai categorical (kategori terurut leksikografis)
+CATEGORICAL_COLUMNS = ["kd_lv_6", "nm_unit", "jns_transaksi"]
+AMOUNT_COLUMNS = ["debet", "kredit"]
+
+
+def parse_tanggal(series):
+    """
+    Parsing tanggal transaksi dengan format dd/mm/yyyy atau serial Excel.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_datetime(series, unit="D", origin="1899-12-30", errors="coerce")
+    return pd.to_datetime(series, format="%d/%m/%Y", errors="coerce")
+
+
+def prepare_bukubesar(df, return_rejected=False):
+    """
+    Normalisasi buku besar satu kali saat dimuat: tanggal di-parse, debet/kredit
+    numerik (NaN -> 0), dan kolom kode/unit/jenis menjadi categorical.
+    Setelah ini halaman cukup memakai mask tanpa menyalin atau mengonversi ulang.
+
+    Baris dengan tgl_transaksi yang tidak bisa di-parse dibuang; dengan
+    `return_rejected=True` baris tersebut (nilai tanggal asli) ikut dikembalikan.
+    """
+    if "tgl_transaksi" not in df.columns:
+        raise KeyError("Kolom 'tgl_transaksi' tidak ditemukan")
+    df = df.copy()
+    raw_tanggal = df["tgl_transaksi"]
+    df["tgl_transaksi"] = parse_tanggal(raw_tanggal)
+    invalid = df["tgl_transaksi"].isna().to_numpy()
+    rejected = df[invalid].assign(tgl_transaksi=raw_tanggal[invalid]).reset_index(drop=True)
+    if invalid.any():
+        df = df[~invalid].reset_index(drop=True)
+    else:
+        df = df.reset_index(drop=True)
+
+    for col in AMOUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("float64")
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            # Sel kosong menjadi "" (pandas 3 mempertahankan NaN pada astype(str))
+            values = df[col].fillna("").astype(str).str.strip()
+            df[col] = pd.Categorical(values, categories=np.sort(values.unique()))
+    if return_rejected:
+        return df, rejected
+    return df
+
+
+def append_ledger(bukubesar, delta):
+    """
+    Gabungkan dua buku besar yang sudah dinormalisasi. Kategori digabung dan
+    tetap terurut; kembalikan (gabungan, delta dengan kategori gabungan).
+    """
+    bukubesar = bukubesar.copy(deep=False)
+    delta = delta.copy(deep=False)
+    for col in CATEGORICAL_COLUMNS:
+        if col in bukubesar.columns and col in delta.columns:
+            categories = bukubesar[col].cat.categories.union(delta[col].cat.categories)
+            if not categories.equals(bukubesar[col].cat.categories):
+                bukubesar[col] = bukubesar[col].cat.set_categories(categories)
+            delta[col] = delta[col].cat.set_categories(categories)
+    merged = pd.concat([bukubesar, delta], ignore_index=True)
+    return merged, delta
+
+
+def prepare_coa(df):
+    """
+    Konversi semua kode akun COA ke string.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if "Kode Akun" in col:
+            df[col] = df[col].astype(str).str.strip()
+    return df
+
+
+def account_mask(bukubesar, kode_akun):
+    """
+    Mask baris dengan kd_lv_6 berawalan `kode_akun`. Karena kategori kd_lv_6
+    terurut, awalan akun adalah satu rentang kode integer.
+    """
+    kd = bukubesar["kd_lv_6"]
+    lo, hi = prefix_range(kd.cat.categories.to_numpy(dtype=object), kode_akun)
+    codes = kd.cat.codes.to_numpy()
+    return (codes >= lo) & (codes < hi)
+
+
+def period_bounds(periode):
+    """
+    Periode (awal, akhir) inklusif -> batas datetime64 [awal, akhir + 1 hari).
+    """
+    start, end = periode
+    return (np.datetime64(pd.Timestamp(start).date(), "ns"),
+            np.datetime64(pd.Timestamp(end).date(), "ns") + np.timedelta64(1, "D"))
+
+
+class DateIndex:
+    """
+    Indeks waktu buku besar: posisi baris diurutkan menurut tgl_transaksi,
+    sehingga rentang tanggal dicari dengan binary search (O(log n + k)).
+    """
+
+    def __init__(self, bukubesar):
+        dates = bukubesar["tgl_transaksi"].to_numpy().astype("datetime64[ns]")
+        self.order = np.argsort(dates, kind="stable")
+        self.dates = dates[self.order]
+
+    def positions(self, periode):
+        """
+        Posisi baris (urut naik) dengan tanggal dalam `periode` (awal, akhir).
+        """
+        start, stop = period_bounds(periode)
+        lo, hi = np.searchsorted(self.dates, [start, stop], side="left")
+        return np.sort(self.order[lo:hi])
+
+    def bounds(self):
+        if len(self.dates) == 0:
+            return None, None
+        return pd.Timestamp(self.dates[0]).date(), pd.Timestamp(self.dates[-1]).date()
+
+
+def filter_mask(bukubesar, kode_akun=None, jenis_transaksi=None, unit=None, tipe="All", periode=None,
+                kata_kunci=None):
+    """
+    Gabungan filter Buku Besar sebagai satu boolean mask (tanpa menyalin data).
+    """
+    mask = np.ones(len(bukubesar), dtype=bool)
+    if kode_akun:
+        mask &= account_mask(bukubesar, kode_akun)
+    if jenis_transaksi:
+        mask &= bukubesar["jns_transaksi"].isin(jenis_transaksi).to_numpy()
+    if unit:
+        mask &= (bukubesar["nm_unit"] == unit).to_numpy()
+    if tipe == "Debet":
+        mask &= bukubesar["debet"].to_numpy() > 0
+    elif tipe == "Kredit":
+        mask &= bukubesar["kredit"].to_numpy() > 0
+    if periode:
+        start, stop = period_bounds(periode)
+        dates = bukubesar["tgl_transaksi"].to_numpy().astype("datetime64[ns]")
+        mask &= (dates >= start) & (dates < stop)
+    if kata_kunci:
+        mask &= keyword_mask(bukubesar["uraian"], kata_kunci)
+    return mask
+
+
+def with_account_names(frame, names):
+    """
+    Tambahkan kolom "Nama Akun 6" dari lookup kode -> nama (CoaIndex.names).
+    """
+    return frame.assign(**{"Nama Akun 6": frame["kd_lv_6"].map(names)})
+
+
+def sort_positions(frame, positions, column, ascending=True):
+    """
+    Urutkan posisi baris hasil filter menurut `column` tanpa menyalin baris:
+    hanya nilai kolom pada posisi tersebut yang diambil.
+    """
+    values = frame[column].iloc[positions]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Kategori terurut leksikografis sehingga kode integer cukup untuk mengurutkan
+        values = values.cat.codes
+    order = np.argsort(values.to_numpy(), kind="stable")
+    if not ascending:
+        order = order[::-1]
+    return positions[order]
+
+
+def page_rows(frame, positions, page, page_size):
+    """
+    Materialisasi satu halaman hasil (baris ke-`page`, mulai dari 0).
+    """
+    start = page * page_size
+    return frame.iloc[positions[start:start + page_size]]
+
+
+def run_query(bukubesar, filter_args, date_index=None, search_index=None):
+    """
+    Hasil filter Buku Besar: posisi baris yang cocok beserta jumlah debet/kredit.
+    Periode (lewat `date_index`) dan kata kunci uraian (lewat `search_index`)
+    dijawab dari indeks; filter lain hanya dievaluasi pada baris kandidatnya.
+    """
+    candidates = None
+    other_args = dict(filter_args)
+    if other_args.get("periode") and date_index is not None:
+        candidates = date_index.positions(other_args.pop("periode"))
+    if other_args.get("kata_kunci") and search_index is not None:
+        found = search_index.search(other_args.pop("kata_kunci"))
+        candidates = found if candidates is None else np.intersect1d(candidates, found, assume_unique=True)
+
+    if candidates is not None:
+        subset = bukubesar.iloc[candidates]
+        positions = candidates[filter_mask(subset, **other_args)]
+    else:
+        positions = np.flatnonzero(filter_mask(bukubesar, **other_args))
+    debet = float(bukubesar["debet"].to_numpy()[positions].sum())
+    kredit = float(bukubesar["kredit"].to_numpy()[positions].sum())
+    return {"positions": positions, "debet": debet, "kredit": kredit}
@@ -0,0 +1,175 @@
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.coa import prefix_range
+from core.ledger import prepare_bukubesar
+from core.snapshot import load_snapshot, read_table
+
+# Buku besar tahun anggaran lain: data/tahun/bukubesar_<tahun>.<xlsb|xlsx|csv|parquet>
+YEARS_DIR = Path("data/tahun")
+_YEAR = re.compile(r"(19|20)\d{2}")
+
+# Hanya kolom ini yang dibaca dari snapshot saat menghitung agregat tahunan
+AGGREGATE_COLUMNS = ["kd_lv_6", "nm_unit", "jns_transaksi", "tgl_transaksi", "debet", "kredit"]
+AGGREGATE_KEYS = ["kd_lv_6", "nm_unit", "jns_transaksi"]
+
+
+def year_files(directory=YEARS_DIR):
+    """
+    Peta tahun -> file buku besar yang terdaftar (tahun diambil dari nama file).
+    """
+    files = {}
+    directory = Path(directory)
+    if not directory.exists():
+        return files
+    for path in sorted(directory.iterdir()):
+        match = _YEAR.search(path.stem)
+        if path.is_file() and match and path.suffix.lower() in (".xlsb", ".xlsx", ".csv", ".parquet"):
+            files[int(match.group(0))] = path
+    return files
+
+
+def year_file_path(year, suffix, directory=YEARS_DIR):
+    return Path(directory) / f"bukubesar_{int(year)}{suffix}"
+
+
+def _aggregate(bukubesar):
+    agg = bukubesar.groupby(AGGREGATE_KEYS, observed=True).agg(
+        debet=("debet", "sum"), kredit=("kredit", "sum"), jumlah=("debet", "size")
+    ).reset_index()
+    for col in AGGREGATE_KEYS:
+        agg[col] = agg[col].astype(str)
+    return agg.sort_values("kd_lv_6", kind="stable").reset_index(drop=True)
+
+
+def year_aggregate(path):
+    """
+    Agregat satu tahun (debet, kredit, banyak baris per kd_lv_6 x nm_unit x
+    jns_transaksi). Snapshot Parquet dibaca memory-mapped dan hanya kolom
+    AGGREGATE_COLUMNS, sehingga baris mentah (mis. uraian) tidak dimuat.
+    """
+    raw = load_snapshot(path, read_table, columns=AGGREGATE_COLUMNS)
+    return _aggregate(prepare_bukubesar(raw))
+
+
+def aggregate_from_cube(cube):
+    """
+    Agregat tahunan dari LedgerCube dataset aktif (tanpa membaca ulang file).
+    """
+    frame = cube.frame.groupby(["akun", "unit", "jenis"], sort=False)[["debet", "kredit", "jumlah"]].sum()
+    frame = frame.reset_index()
+    agg = pd.DataFrame({
+        "kd_lv_6": cube.accounts[frame["akun"].to_numpy()].astype(str),
+        "nm_unit": cube.units.to_numpy()[frame["unit"].to_numpy()].astype(str),
+        "jns_transaksi": cube.jenis.to_numpy()[frame["jenis"].to_numpy()].astype(str),
+        "debet": frame["debet"].to_numpy(),
+        "kredit": frame["kredit"].to_numpy(),
+        "jumlah": frame["jumlah"].to_numpy(),
+    })
+    return agg.sort_values("kd_lv_6", kind="stable").reset_index(drop=True)
+
+
+def yearly_aggregates(sources, max_workers=None, progress=None):
+    """
+    Hitung agregat beberapa tahun secara paralel (process pool, satu tahun per
+    pekerja). Hanya agregat yang kembali ke proses utama; baris mentah setiap
+    tahun dilepas begitu pekerjanya selesai. `sources`: tahun -> path.
+    """
+    results = {}
+    if not sources:
+        return results
+    workers = min(max_workers or len(sources), len(sources))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(year_aggregate, str(path)): year for year, path in sources.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(done, len(futures))
+    return results
+
+
+def aggregate_leaf_balances(agg, unit=None, exclude_jenis=("Jurnal Penutup",)):
+    """
+    Saldo (debet - kredit) per kd_lv_6 dari agregat tahunan, setara dengan
+    `core.rollup.leaf_balances` pada buku besar tahun tersebut.
+    """
+    keep = np.ones(len(agg), dtype=bool)
+    if unit:
+        keep &= (agg["nm_unit"] == unit).to_numpy()
+    if exclude_jenis:
+        keep &= ~agg["jns_transaksi"].isin(exclude_jenis).to_numpy()
+    part = agg[keep]
+    return (part["debet"] - part["kredit"]).groupby(part["kd_lv_6"].to_numpy()).sum()
+
+
+def aggregate_account_balance(agg, kode_akun=None, jenis_transaksi=None, unit=None):
+    """
+    Jumlah debet, kredit, saldo dan banyak baris untuk filter akun (awalan kode
+    level mana pun), jenis transaksi dan unit pada agregat tahunan.
+    """
+    part = agg
+    if kode_akun:
+        lo, hi = prefix_range(agg["kd_lv_6"].to_numpy(dtype=object), kode_akun)
+        part = part.iloc[lo:hi]
+    keep = np.ones(len(part), dtype=bool)
+    if jenis_transaksi:
+        keep &= part["jns_transaksi"].isin(jenis_transaksi).to_numpy()
+    if unit:
+        keep &= (part["nm_unit"] == unit).to_numpy()
+    part = part[keep]
+    debet = float(part["debet"].sum())
+    kredit = float(part["kredit"].sum())
+    return {"debet": debet, "kredit": kredit, "saldo": debet - kredit, "jumlah": int(part["jumlah"].sum())}
+
+
+def percent_change(current, prior):
+    """
+    Persentase perubahan terhadap nilai pembanding (NaN bila pembanding nol).
+    """
+    current = np.asarray(current, dtype=float)
+    prior = np.asarray(prior, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prior != 0, (current - prior) / np.abs(prior) * 100, np.nan)
+
+
+def compare_statements(current, prior, current_label, prior_label):
+    """
+    Gabungkan dua laporan (Kode Rek, Uraian, Saldo) berdampingan dengan kolom
+    Selisih dan % Perubahan. Urutan baris mengikuti laporan tahun berjalan.
+    """
+    key = ["Kode Rek", "Uraian"]
+    merged = current[key + ["Saldo"]].merge(
+        prior[key + ["Saldo"]], on=key, how="left", suffixes=("_cur", "_prior"), sort=False
+    )
+    # Akun yang hanya ada di laporan pembanding ditambahkan di akhir
+    only_prior = prior.merge(current[key], on=key, how="left", indicator=True)
+    only_prior = only_prior[only_prior["_merge"] == "left_only"]
+    merged = pd.concat([
+        merged,
+        pd.DataFrame({"Kode Rek": only_prior["Kode Rek"], "Uraian": only_prior["Uraian"],
+                      "Saldo_prior": only_prior["Saldo"]}),
+    ], ignore_index=True).fillna({"Saldo_cur": 0, "Saldo_prior": 0})
+    return pd.DataFrame({
+        "Kode Rek": merged["Kode Rek"],
+        "Uraian": merged["Uraian"],
+        str(prior_label): merged["Saldo_prior"],
+        str(current_label): merged["Saldo_cur"],
+        "Selisih": merged["Saldo_cur"] - merged["Saldo_prior"],
+        "% Perubahan": percent_change(merged["Saldo_cur"], merged["Saldo_prior"]),
+    })
+
+
+def ledger_year(cube):
+    """
+    Tahun anggaran buku besar: tahun dengan baris transaksi terbanyak.
+    """
+    months = cube.frame["bulan"].to_numpy()
+    if not len(months):
+        return None
+    years = months // 12 + 1970
+    counts = np.bincount(years - years.min(), weights=cube.frame["jumlah"].to_numpy())
+    return int(years.min() + counts.argmax())
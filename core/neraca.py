@@ -0,0 +1,110 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.cube import month_index
+from core.rollup import lra_accounts, rollup
+
+NERACA_KELAS = ("1", "2", "3")
+SALDO_AWAL = "Saldo Awal"
+
+
+def month_label(month):
+    """
+    Bulan integer (bulan sejak 1970-01) -> "YYYY-MM".
+    """
+    return str(np.datetime64(int(month), "M"))
+
+
+class NeracaEngine:
+    """
+    Saldo akun neraca (kelas 1-3) per periode. Saldo awal diambil dari jurnal
+    "Saldo Awal", mutasi disimpan per bulan x kd_lv_6, dan saldo kumulatif
+    berjalan disimpan sehingga memindah tanggal laporan hanya menambah atau
+    mengurangi mutasi bulan yang berselisih.
+    """
+
+    def __init__(self, bukubesar):
+        kd = bukubesar["kd_lv_6"]
+        kelas = kd.cat.categories.str.split(".").str[0]
+        is_neraca = np.isin(kelas, NERACA_KELAS)[kd.cat.codes.to_numpy()]
+        df = bukubesar[is_neraca]
+
+        codes = df["kd_lv_6"].cat.codes.to_numpy()
+        leaf_codes, leaf_pos = np.unique(codes, return_inverse=True)
+        self.leaves = pd.Index(kd.cat.categories[leaf_codes].astype(str))
+        amount = df["debet"].to_numpy() - df["kredit"].to_numpy()
+        opening_rows = (df["jns_transaksi"] == SALDO_AWAL).to_numpy()
+
+        self.opening = np.bincount(
+            leaf_pos[opening_rows], weights=amount[opening_rows], minlength=len(self.leaves)
+        )
+
+        months = month_index(df["tgl_transaksi"])[~opening_rows]
+        if len(months):
+            self.months = np.arange(months.min(), months.max() + 1)
+        else:
+            self.months = np.array([], dtype="int64")
+        month_pos = months - (self.months[0] if len(self.months) else 0)
+        flat = month_pos * len(self.leaves) + leaf_pos[~opening_rows]
+        self.deltas = np.bincount(
+            flat, weights=amount[~opening_rows], minlength=len(self.months) * len(self.leaves)
+        ).reshape(len(self.months), len(self.leaves))
+
+        # Saldo berjalan: saldo awal + mutasi bulan [0, _cursor)
+        self._cursor = 0
+        self._running = self.opening.copy()
+        self._lock = threading.Lock()
+
+    def month_labels(self):
+        return [month_label(m) for m in self.months]
+
+    def leaf_balances(self, month=None):
+        """
+        Saldo kumulatif per kd_lv_6 sampai dengan akhir `month` ("YYYY-MM");
+        None berarti bulan terakhir.
+        """
+        if month is None:
+            target = len(self.months)
+        else:
+            wanted = np.datetime64(str(month), "M").astype("int64")
+            target = int(np.clip(np.searchsorted(self.months, wanted, side="right"), 0, len(self.months)))
+        with self._lock:
+            if target > self._cursor:
+                self._running += self.deltas[self._cursor:target].sum(axis=0)
+            elif target < self._cursor:
+                self._running -= self.deltas[target:self._cursor].sum(axis=0)
+            self._cursor = target
+            return pd.Series(self._running.copy(), index=self.leaves)
+
+
+def build_neraca(engine, coa, month=None, detail_level=3):
+    """
+    Susun Neraca (Aset, Kewajiban, Ekuitas) per akhir `month`. Saldo aset
+    bernilai debet - kredit; kewajiban dan ekuitas kredit - debet.
+    """
+    saldo = rollup(engine.leaf_balances(month), max_level=detail_level)
+    accounts = lra_accounts(coa, detail_level)
+
+    def section(kelas, sign):
+        rows = accounts[
+            (accounts["Kode Akun"] == kelas) | accounts["Kode Akun"].str.startswith(f"{kelas}.")
+        ]
+        return pd.DataFrame({
+            "Kode Rek": rows["Kode Akun"].values,
+            "Uraian": rows["Nama Akun"].values,
+            "Saldo": sign * saldo.reindex(rows["Kode Akun"]).fillna(0).values,
+        })
+
+    total = lambda kode: saldo.get(kode, 0)
+    total_aset = total("1")
+    total_pasiva = -(total("2") + total("3"))
+
+    return pd.concat([
+        section("1", 1),
+        pd.DataFrame([{"Kode Rek": "", "Uraian": "Jumlah Aset", "Saldo": total_aset}]),
+        section("2", -1),
+        section("3", -1),
+        pd.DataFrame([{"Kode Rek": "", "Uraian": "Jumlah Kewajiban dan Ekuitas", "Saldo": total_pasiva}]),
+    ], ignore_index=True)
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Interval sampling RSS (detik) selama satu tahap berjalan
+SAMPLE_INTERVAL = 0.005
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    """
+    Resident set size proses saat ini (Linux, /proc); None bila tidak tersedia.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _RssSampler(threading.Thread):
+    """
+    Thread latar yang mencatat RSS tertinggi selama satu tahap. Berbeda dengan
+    tracemalloc, cara ini tidak memperlambat kode yang diukur dan ikut menghitung
+    memori di luar Python (numpy, Arrow).
+    """
+
+    def __init__(self, start_rss):
+        super().__init__(daemon=True)
+        self.peak = start_rss
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(SAMPLE_INTERVAL):
+            self.peak = max(self.peak, rss_bytes() or 0)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, rss_bytes() or 0)
+        return self.peak
+
+
+class Profiler:
+    """
+    Pencatat waktu dan memori puncak per tahap (muat, praproses, filter, merge,
+    rollup, ekspor). Memori puncak adalah kenaikan RSS proses tertinggi selama
+    tahap berjalan; karena RSS milik seluruh proses, angkanya perkiraan bila
+    beberapa sesi berjalan bersamaan.
+    """
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.records = []
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name, **info):
+        """
+        Ukur satu tahap. Nilai yang dimasukkan ke dict hasil `yield` (mis. jumlah
+        baris) ikut dicatat.
+        """
+        start_rss = rss_bytes() if self.track_memory else None
+        sampler = None
+        if start_rss is not None:
+            sampler = _RssSampler(start_rss)
+            sampler.start()
+        depth = self._depth
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - started
+            self._depth -= 1
+            peak_mb = (sampler.stop() - start_rss) / 1e6 if sampler is not None else None
+            self.records.append({
+                "stage": name,
+                "depth": depth,
+                "seconds": seconds,
+                "peak_mb": peak_mb,
+                **info,
+            })
+            logger.debug("%s: %.1f ms", name, seconds * 1000)
+
+    def extend(self, records, **info):
+        """
+        Tambahkan catatan dari profiler lain (mis. profil saat dataset dimuat).
+        """
+        self.records.extend({**record, **info} for record in records)
+
+    def summary(self):
+        return pd.DataFrame(self.records, columns=None if self.records else ["stage", "depth", "seconds", "peak_mb"])
+
+    def to_json(self):
+        return json.dumps({
+            "stages": self.records,
+            "total_seconds": sum(r["seconds"] for r in self.records if r["depth"] == 0),
+        }, indent=2, default=str)
@@ -0,0 +1,97 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Batas memori cache hasil query (MB), bisa diubah lewat environment variable
+DEFAULT_BUDGET_MB = float(os.environ.get("LKT_QUERY_CACHE_MB", "256"))
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 64
+
+
+class QueryCache:
+    """
+    Cache LRU hasil filter Buku Besar, dibagi oleh semua sesi dalam proses.
+    Entri dikeluarkan mulai dari yang paling lama tidak dipakai bila total
+    ukurannya melebihi `max_bytes`.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+        return value
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_mb": self._size / 1e6,
+                "budget_mb": self.max_bytes / 1e6,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+query_cache = QueryCache(int(DEFAULT_BUDGET_MB * 1e6))
+
+
+def query_key(filter_args, version):
+    """
+    Kunci cache: (kode_akun, jenis transaksi, unit, tipe, periode, kata kunci, versi dataset).
+    """
+    jenis = filter_args.get("jenis_transaksi")
+    return (
+        filter_args.get("kode_akun"),
+        tuple(sorted(jenis)) if jenis else None,
+        filter_args.get("unit"),
+        filter_args.get("tipe", "All"),
+        filter_args.get("periode"),
+        filter_args.get("kata_kunci"),
+        version,
+    )
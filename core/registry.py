@@ -0,0 +1,384 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from core.coa import CoaIndex
+from core.cube import LedgerCube
+from core.ingest import DeltaStore, read_delta, select_new_postings, select_new_rejected
+from core.integrity import check_ledger
+from core.ledger import append_ledger, prepare_bukubesar, prepare_coa
+from core.multiyear import (
+    YEARS_DIR, aggregate_from_cube, ledger_year, year_file_path, year_files, yearly_aggregates,
+)
+from core.profiling import Profiler
+from core.query_cache import query_cache
+from core.rollup import StatementRollup
+from core.snapshot import file_fingerprint, load_snapshot, read_bukubesar_xlsb, read_coa_xlsx, read_table
+from core.xlsb import scan_unique
+
+BUKUBESAR_PATH = "data/bukubesar.xlsb"
+COA_PATH = "data/coa.xlsx"
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    Satu versi data (buku besar + COA) yang dibagi bersama oleh semua sesi.
+    Objek ini hanya-baca: halaman tidak boleh mengubah DataFrame di dalamnya.
+    """
+    bukubesar: pd.DataFrame
+    coa: pd.DataFrame
+    coa_index: CoaIndex
+    cube: LedgerCube
+    version: tuple
+    parts: tuple = ()
+    profile: tuple = field(default=(), compare=False, repr=False)
+    rejected: pd.DataFrame = field(default=None, compare=False, repr=False)
+    _derived: dict = field(default_factory=dict, compare=False, repr=False)
+    _derived_lock: threading.Lock = field(default_factory=threading.Lock, compare=False, repr=False)
+
+    @property
+    def identity(self):
+        """
+        Identitas isi dataset: versi file sumber + bagian delta yang sudah
+        diterapkan. Dipakai sebagai kunci cache hasil query per sesi/antar sesi.
+        """
+        return (self.version, self.parts)
+
+    def derived(self, name, build):
+        """
+        Struktur turunan (indeks, engine laporan, dsb.) yang dibangun sekali per
+        versi dataset dan dibagi oleh semua sesi.
+        """
+        # Satu Future per nama: sesi yang meminta nama yang sama menunggu
+        # pembangunan pertama, nama lain dan reload dataset tidak ikut tertahan.
+        with self._derived_lock:
+            future = self._derived.get(name)
+            owner = future is None
+            if owner:
+                future = self._derived[name] = Future()
+        if owner:
+            try:
+                future.set_result(build(self))
+            except BaseException as e:
+                with self._derived_lock:
+                    del self._derived[name]
+                future.set_exception(e)
+        return future.result()
+
+    def _built(self, name):
+        # Nilai turunan yang sudah selesai dibangun, atau None
+        future = self._derived.get(name)
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def extended(self, delta, parts, version, rejected=None):
+        """
+        Dataset baru dengan tambahan posting `delta` (dan baris ditolaknya).
+        Cube dan indeks no_bukti diperbarui secara inkremental; struktur
+        turunan lain dibangun ulang saat diminta.
+        """
+        profiler = Profiler()
+        with profiler.stage("merge.delta", rows=len(delta)):
+            bukubesar, delta = append_ledger(self.bukubesar, delta)
+        with profiler.stage("index.cube"):
+            cube = self.cube.extended(delta)
+        dataset = Dataset(
+            bukubesar=bukubesar,
+            coa=self.coa,
+            coa_index=self.coa_index,
+            cube=cube,
+            version=version,
+            parts=parts,
+            profile=self.profile + tuple(profiler.records),
+            rejected=_concat_rejected(self.rejected, rejected),
+        )
+        known = self._built("no_bukti")
+        if known is not None:
+            added = pd.Index(delta["no_bukti"].unique())
+            future = Future()
+            future.set_result(known.append(added[known.get_indexer(added) < 0]))
+            dataset._derived["no_bukti"] = future
+        return dataset
+
+
+_lock = threading.RLock()
+_current = None
+_checks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="integrity")
+
+
+def _concat_rejected(base, extra):
+    # Baris ditolak buku besar dasar + baris ditolak bagian delta
+    if extra is None or len(extra) == 0:
+        return base
+    if base is None or len(base) == 0:
+        return extra
+    return pd.concat([base, extra], ignore_index=True)
+
+
+def _source_version(*paths):
+    # Cek murah (mtime + ukuran) di setiap rerun; sidik jari isi dihitung di snapshot
+    version = []
+    for path in paths:
+        stat = os.stat(path)
+        version.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+@dataclass(frozen=True)
+class Coa:
+    """
+    COA bersama beserta indeks hierarkinya.
+    """
+    coa: pd.DataFrame
+    coa_index: CoaIndex
+    version: tuple
+
+
+_coa_current = None
+
+
+def get_coa():
+    """
+    Ambil COA bersama tanpa memuat buku besar (dipakai juga oleh mode ledger besar).
+    """
+    global _coa_current
+    version = _source_version(COA_PATH)
+    current = _coa_current
+    if current is not None and current.version == version:
+        return current
+    with _lock:
+        if _coa_current is None or _coa_current.version != version:
+            coa = prepare_coa(load_snapshot(COA_PATH, read_coa_xlsx))
+            _coa_current = Coa(coa=coa, coa_index=CoaIndex(coa), version=version)
+            query_cache.clear()
+        return _coa_current
+
+
+_base_fingerprint = {}
+
+
+def base_fingerprint():
+    """
+    Sidik jari isi bukubesar.xlsb (di-cache per mtime/ukuran file).
+    """
+    version = _source_version(BUKUBESAR_PATH)
+    if version not in _base_fingerprint:
+        _base_fingerprint.clear()
+        _base_fingerprint[version] = file_fingerprint(BUKUBESAR_PATH)
+    return _base_fingerprint[version]
+
+
+def delta_store():
+    return DeltaStore(base_fingerprint())
+
+
+def open_dataset(bukubesar_path=BUKUBESAR_PATH, coa_path=COA_PATH, include_delta=True):
+    """
+    Muat dataset mandiri (tidak dibagi lewat registry) dari file apa pun,
+    misalnya untuk CLI atau skrip batch. Posting delta bulanan milik file
+    tersebut ikut diterapkan bila `include_delta`.
+    """
+    bukubesar, rejected = prepare_bukubesar(load_snapshot(bukubesar_path, read_table), return_rejected=True)
+    parts = ()
+    if include_delta:
+        store = DeltaStore(file_fingerprint(bukubesar_path))
+        parts = store.parts()
+        for part in parts:
+            bukubesar, _ = append_ledger(bukubesar, store.load_part(part))
+            rejected = _concat_rejected(rejected, store.load_rejected(part))
+    coa = prepare_coa(load_snapshot(coa_path, read_table))
+    return Dataset(
+        bukubesar=bukubesar,
+        coa=coa,
+        coa_index=CoaIndex(coa),
+        cube=LedgerCube(bukubesar),
+        version=_source_version(bukubesar_path, coa_path),
+        parts=parts,
+        rejected=rejected,
+    )
+
+
+def _load(version, parts):
+    profiler = Profiler()
+    store = delta_store()
+    with profiler.stage("load.snapshot") as info:
+        raw = load_snapshot(BUKUBESAR_PATH, read_bukubesar_xlsb)
+        info["rows"] = len(raw)
+    with profiler.stage("preprocess.bukubesar"):
+        bukubesar, rejected = prepare_bukubesar(raw, return_rejected=True)
+    del raw
+    if parts:
+        with profiler.stage("merge.delta", parts=len(parts)):
+            for part in parts:
+                bukubesar, _ = append_ledger(bukubesar, store.load_part(part))
+                rejected = _concat_rejected(rejected, store.load_rejected(part))
+    with profiler.stage("load.coa"):
+        coa = get_coa()
+    with profiler.stage("index.cube"):
+        cube = LedgerCube(bukubesar)
+    return Dataset(
+        bukubesar=bukubesar,
+        coa=coa.coa,
+        coa_index=coa.coa_index,
+        cube=cube,
+        version=version,
+        parts=parts,
+        profile=tuple(profiler.records),
+        rejected=rejected,
+    )
+
+
+def get_dataset():
+    """
+    Ambil dataset bersama untuk seluruh proses. Dataset dimuat ulang (dan
+    diganti secara atomik) hanya bila file sumber berubah. Bila yang berubah
+    hanya bagian delta bulanan, posting baru ditambahkan secara inkremental.
+    """
+    global _current
+    version = _source_version(BUKUBESAR_PATH, COA_PATH)
+    parts = delta_store().parts()
+    dataset = _current
+    if dataset is not None and dataset.version == version and dataset.parts == parts:
+        return dataset
+    with _lock:
+        current = _current
+        if current is None or current.version != version or current.parts != parts[:len(current.parts)]:
+            _current = _load(version, parts)
+        elif current.parts != parts:
+            store = delta_store()
+            for i in range(len(current.parts), len(parts)):
+                current = current.extended(
+                    store.load_part(parts[i]), parts[:i + 1], version, store.load_rejected(parts[i])
+                )
+            _current = current
+        else:
+            return current
+        # Hasil query versi lama tidak berlaku lagi
+        query_cache.clear()
+        integrity_checks(_current)
+        return _current
+
+
+def statement_rollup(dataset):
+    """
+    Rollup saldo bersama untuk laporan berbasis kolom "Laporan" COA (LRA, LO).
+    Dibangun sekali per versi dataset dari cube, tanpa memindai buku besar.
+    """
+    return dataset.derived("statements", lambda ds: StatementRollup(ds.cube.leaf_balances(), ds.coa))
+
+
+def integrity_checks(dataset):
+    """
+    Future hasil pemeriksaan integritas buku besar (`core.integrity.check_ledger`).
+    Pemeriksaan dijalankan sekali per versi dataset di thread latar sehingga
+    halaman tidak menunggu; dimulai otomatis setiap dataset selesai dimuat.
+    """
+    return dataset.derived(
+        "integrity",
+        lambda ds: _checks.submit(check_ledger, ds.bukubesar, ds.coa_index, ds.rejected),
+    )
+
+
+def known_bukti(dataset):
+    """
+    Indeks no_bukti unik buku besar. Dibangun penuh sekali; versi dataset
+    berikutnya (`Dataset.extended`) hanya menambahkan no_bukti dari delta.
+    """
+    return dataset.derived("no_bukti", lambda ds: pd.Index(ds.bukubesar["no_bukti"].unique()))
+
+
+def ingest_delta(source, read_func=read_bukubesar_xlsb, source_name=None):
+    """
+    Tambahkan posting baru dari file ekspor bulanan ke penyimpanan delta lalu
+    perbarui dataset bersama. Baris bertanggal tidak valid disimpan bersama
+    bagiannya dan muncul di temuan integritas. Kembalikan banyak baris baru
+    yang ditambahkan.
+    """
+    with _lock:
+        dataset = get_dataset()
+        known = known_bukti(dataset)
+        delta, rejected = read_delta(source, read_func, return_rejected=True)
+        delta = select_new_postings(dataset.bukubesar, delta, known)
+        rejected = select_new_rejected(rejected, dataset.rejected)
+        if len(delta) == 0 and len(rejected) == 0:
+            return 0
+        delta_store().append(
+            delta, source_name=source_name or os.path.basename(str(source)), rejected=rejected
+        )
+        get_dataset()
+        return len(delta)
+
+
+_units = {}
+
+
+def get_ledger_units(progress=None):
+    """
+    Daftar nm_unit untuk mode ledger besar, dipindai bertahap dari file xlsb
+    sekali per versi file.
+    """
+    version = _source_version(BUKUBESAR_PATH)
+    if version not in _units:
+        units = scan_unique(BUKUBESAR_PATH, "nm_unit", progress=progress)
+        _units.clear()
+        _units[version] = units
+    return _units[version]
+
+
+_years_lock = threading.Lock()
+_year_aggregates = {}
+
+
+def current_year(dataset):
+    return dataset.derived("tahun", lambda ds: ledger_year(ds.cube))
+
+
+def year_aggregates(progress=None, max_workers=None):
+    """
+    Agregat tahunan (tahun -> agregat kd_lv_6 x nm_unit x jns_transaksi) untuk
+    buku besar aktif dan semua tahun yang terdaftar di YEARS_DIR. Tahun yang
+    belum dihitung (atau filenya berubah) diproses paralel; agregat disimpan
+    per versi file sehingga baris mentah tahun lain tidak pernah ditahan di memori.
+    """
+    dataset = get_dataset()
+    current = current_year(dataset)
+    sources = {year: path for year, path in year_files().items() if year != current}
+    versions = {year: _source_version(path) for year, path in sources.items()}
+    with _years_lock:
+        for year in list(_year_aggregates):
+            if year not in sources:
+                del _year_aggregates[year]
+        missing = {
+            year: path for year, path in sources.items()
+            if year not in _year_aggregates or _year_aggregates[year][0] != versions[year]
+        }
+        for year, agg in yearly_aggregates(missing, max_workers, progress).items():
+            _year_aggregates[year] = (versions[year], agg)
+        result = {year: _year_aggregates[year][1] for year in sources}
+    if current is not None:
+        result[current] = dataset.derived("aggregate", lambda ds: aggregate_from_cube(ds.cube))
+    return dict(sorted(result.items()))
+
+
+def register_year(source, year, suffix=".xlsb"):
+    """
+    Daftarkan buku besar tahun anggaran lain: salin `source` (path atau bytes)
+    ke YEARS_DIR secara atomik. Snapshot dan agregatnya dibuat saat dibutuhkan.
+    """
+    YEARS_DIR.mkdir(parents=True, exist_ok=True)
+    previous = year_files().get(int(year))
+    target = year_file_path(year, suffix)
+    data = source if isinstance(source, (bytes, bytearray, memoryview)) else Path(source).read_bytes()
+    tmp = target.with_name(f"{target.name}.tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, target)
+    if previous is not None and previous != target:
+        previous.unlink()
+    return target
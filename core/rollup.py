@@ -0,0 +1,146 @@
+import pandas as pd
+
+from core.coa import MAX_LEVEL, code_sort_key, coa_accounts
+
+
+def prefix_at_level(codes, level):
+    """
+    Potong kode akun menjadi kode induknya pada `level` ("5.1.02.01" -> "5.1").
+    """
+    return pd.Index(codes).astype(str).str.split(".", n=level).str[:level].str.join(".")
+
+
+def leaf_balances(bukubesar, exclude_jenis=("Jurnal Penutup",)):
+    """
+    Agregasi saldo (debet - kredit) satu kali per kd_lv_6 dari buku besar
+    yang sudah dinormalisasi (lihat `core.ledger.prepare_bukubesar`).
+    """
+    df = bukubesar
+    if exclude_jenis:
+        df = df[~df["jns_transaksi"].isin(exclude_jenis)]
+    saldo = (df["debet"] - df["kredit"]).groupby(df["kd_lv_6"], observed=True).sum()
+    saldo.index = saldo.index.astype(str)
+    return saldo
+
+
+def rollup(leaf_saldo, max_level=MAX_LEVEL):
+    """
+    Turunkan saldo setiap akun induk (level 1..max_level) dari saldo kd_lv_6
+    dengan pengelompokan prefiks. Hasil: Series kode akun -> saldo.
+
+    Pada setiap level hanya kode dengan segmen sebanyak level itu yang ikut,
+    sehingga kode pendek/tidak valid (mis. "9" atau "5.1") tidak menghasilkan
+    label ganda di beberapa level.
+    """
+    depth = pd.Index(leaf_saldo.index).astype(str).str.count(r"\.").to_numpy() + 1
+    parts = []
+    for level in range(1, max_level + 1):
+        part = leaf_saldo[depth >= level]
+        parts.append(part.groupby(prefix_at_level(part.index, level).values).sum())
+    return pd.concat(parts)
+
+
+def lra_accounts(coa, detail_level=3):
+    """
+    Akun COA yang tampil di LRA (level 1..detail_level), urut hierarkis.
+    """
+    accounts = coa_accounts(coa)
+    accounts = accounts[accounts["Level"] <= detail_level]
+    return accounts.iloc[code_sort_key(accounts["Kode Akun"]).argsort()].reset_index(drop=True)
+
+
+# Susunan laporan per nilai kolom "Laporan" COA: ("akun", kelas) menampilkan
+# pohon akun kelas tersebut, ("total", uraian, kode...) baris jumlah saldo kode-kode itu
+STATEMENT_LAYOUTS = {
+    "LRA": [
+        ("akun", "4"),
+        ("akun", "5"),
+        ("total", "Surplus/Defisit", "4", "5"),
+        ("akun", "6"),
+        ("total", "SILPA/SIKPA", "4", "5", "6"),
+    ],
+    "LO": [
+        ("akun", "7"),
+        ("akun", "8"),
+        ("total", "Surplus/Defisit dari Kegiatan Operasional", "7.1", "7.2", "7.3", "8.1", "8.2"),
+        ("total", "Surplus/Defisit dari Kegiatan Non Operasional", "7.4", "8.3"),
+        ("total", "Surplus/Defisit dari Pos Luar Biasa", "7.5", "8.4"),
+        ("total", "Surplus/Defisit-LO", "7", "8"),
+    ],
+}
+
+
+def statement_accounts(coa, laporan, detail_level=3):
+    """
+    Akun COA untuk laporan `laporan` (nilai kolom "Laporan", mis. "LRA" atau
+    "LO") pada level 1..detail_level, urut hierarkis.
+    """
+    accounts = coa_accounts(coa)
+    accounts = accounts[(accounts["Level"] <= detail_level) & (accounts["Laporan"] == laporan)]
+    return accounts.iloc[code_sort_key(accounts["Kode Akun"]).argsort()].reset_index(drop=True)
+
+
+def build_statement(saldo, accounts, layout):
+    """
+    Susun laporan (Kode Rek, Uraian, Saldo) dari saldo semua level (`rollup`)
+    menurut `layout` (lihat STATEMENT_LAYOUTS).
+    """
+    def section(kelas):
+        rows = accounts[
+            (accounts["Kode Akun"] == kelas) | accounts["Kode Akun"].str.startswith(f"{kelas}.")
+        ]
+        return pd.DataFrame({
+            "Kode Rek": rows["Kode Akun"].values,
+            "Uraian": rows["Nama Akun"].values,
+            "Saldo": saldo.reindex(rows["Kode Akun"]).fillna(0).values,
+        })
+
+    total = lambda kode: saldo.get(kode, 0)
+
+    parts = []
+    for entry in layout:
+        if entry[0] == "akun":
+            parts.append(section(entry[1]))
+        else:
+            _, uraian, *codes = entry
+            parts.append(pd.DataFrame([{"Kode Rek": "", "Uraian": uraian, "Saldo": sum(total(k) for k in codes)}]))
+    return pd.concat(parts, ignore_index=True)
+
+
+def lra_from_leaf_balances(leaf_saldo, accounts, detail_level=3):
+    """
+    Susun Laporan Realisasi Anggaran (Pendapatan, Belanja, Surplus/Defisit,
+    Pembiayaan, SILPA/SIKPA) dari saldo per kd_lv_6 dan daftar `lra_accounts`.
+    """
+    saldo = rollup(leaf_saldo, max_level=detail_level)
+    return build_statement(saldo, accounts, STATEMENT_LAYOUTS["LRA"])
+
+
+def build_lra(bukubesar, coa, detail_level=3):
+    """
+    LRA dari satu kali agregasi buku besar.
+    """
+    return lra_from_leaf_balances(
+        leaf_balances(bukubesar), lra_accounts(coa, detail_level), detail_level
+    )
+
+
+class StatementRollup:
+    """
+    Saldo seluruh akun (level 1..6) yang diturunkan sekali dari saldo per
+    kd_lv_6. Semua laporan berbasis kolom "Laporan" COA (LRA, LO, ...) dibaca
+    dari rollup yang sama, sehingga laporan kedua dan seterusnya tidak
+    memindai buku besar lagi.
+    """
+
+    def __init__(self, leaf_saldo, coa):
+        self.leaf_saldo = leaf_saldo
+        self.saldo = rollup(leaf_saldo, max_level=MAX_LEVEL)
+        self.coa = coa
+        self._accounts = {}
+
+    def statement(self, laporan, detail_level=3):
+        key = (laporan, detail_level)
+        if key not in self._accounts:
+            self._accounts[key] = statement_accounts(self.coa, laporan, detail_level)
+        return build_statement(self.saldo, self._accounts[key], STATEMENT_LAYOUTS[laporan])
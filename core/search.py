@@ -0,0 +1,117 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+_TOKEN = re.compile(r"\w+")
+_QUERY = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+def _csr(keys, n_keys):
+    """
+    Kelompokkan posisi menurut `keys`: (urutan posisi, offset awal per kunci).
+    """
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(n_keys + 1, dtype="int64")
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=offsets[1:])
+    return order, offsets
+
+
+def parse_query(query):
+    """
+    Pisahkan query menjadi frasa (dalam tanda kutip) dan kata lepas.
+    """
+    phrases, words = [], []
+    for phrase, word in _QUERY.findall(query):
+        if phrase:
+            phrases.append(phrase.lower())
+        else:
+            words.extend(tokenize(word))
+    return phrases, words
+
+
+class UraianIndex:
+    """
+    Indeks terbalik token -> baris untuk kolom uraian, dibangun sekali saat
+    data dimuat. Setiap kata dicocokkan sebagai awalan token (prefix match);
+    teks dalam tanda kutip dicocokkan sebagai frasa utuh.
+    """
+
+    def __init__(self, uraian):
+        # Uraian berulang (honorarium, nama vendor, dst.) hanya di-token sekali
+        text_ids, texts = pd.factorize(uraian.astype(str), use_na_sentinel=False)
+        self.texts = pd.Index(texts).str.lower()
+        self._row_order, self._row_offsets = _csr(text_ids, len(texts))
+
+        tokens = pd.Series(self.texts).str.findall(_TOKEN.pattern).explode().dropna()
+        pairs = pd.DataFrame({"token": tokens.to_numpy(), "text": tokens.index.to_numpy()})
+        pairs = pairs.drop_duplicates()
+        token_ids, vocabulary = pd.factorize(pairs["token"], sort=True)
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        order, self._token_offsets = _csr(token_ids, len(vocabulary))
+        self._token_texts = pairs["text"].to_numpy()[order]
+
+    def _texts_with_prefix(self, prefix):
+        lo = np.searchsorted(self.vocabulary, prefix, side="left")
+        hi = np.searchsorted(self.vocabulary, prefix + "￿", side="left")
+        if lo == hi:
+            return np.array([], dtype="int64")
+        start, stop = self._token_offsets[lo], self._token_offsets[hi]
+        return np.unique(self._token_texts[start:stop])
+
+    def _texts_with_token(self, token):
+        i = np.searchsorted(self.vocabulary, token, side="left")
+        if i == len(self.vocabulary) or self.vocabulary[i] != token:
+            return np.array([], dtype="int64")
+        return self._token_texts[self._token_offsets[i]:self._token_offsets[i + 1]]
+
+    def search_texts(self, query):
+        """
+        Id teks uraian (unik) yang memuat semua kata/frasa pada query.
+        """
+        phrases, words = parse_query(query)
+        result = None
+        for word in words:
+            found = self._texts_with_prefix(word)
+            result = found if result is None else np.intersect1d(result, found, assume_unique=True)
+        for phrase in phrases:
+            # Kandidat dari token frasa, lalu verifikasi frasa hanya pada teks unik kandidat
+            candidates = None
+            for token in tokenize(phrase):
+                found = np.sort(self._texts_with_token(token))
+                candidates = found if candidates is None else np.intersect1d(candidates, found, assume_unique=True)
+            if candidates is None:
+                continue
+            candidates = candidates[self.texts[candidates].str.contains(phrase, regex=False)]
+            result = candidates if result is None else np.intersect1d(result, candidates, assume_unique=True)
+        return np.array([], dtype="int64") if result is None else result
+
+    def search(self, query):
+        """
+        Posisi baris (urut naik) yang uraiannya cocok dengan query.
+        """
+        text_ids = self.search_texts(query)
+        if len(text_ids) == 0:
+            return np.array([], dtype="int64")
+        starts = self._row_offsets[text_ids]
+        stops = self._row_offsets[text_ids + 1]
+        rows = np.concatenate([self._row_order[a:b] for a, b in zip(starts, stops)])
+        return np.sort(rows)
+
+
+def keyword_mask(uraian, query):
+    """
+    Padanan `UraianIndex.search` tanpa indeks (dipakai pada hasil mode ledger besar).
+    """
+    phrases, words = parse_query(query)
+    text = uraian.astype(str).str.lower()
+    mask = np.ones(len(text), dtype=bool)
+    for word in words:
+        mask &= text.str.contains(rf"\b{re.escape(word)}", regex=True).to_numpy()
+    for phrase in phrases:
+        mask &= text.str.contains(phrase, regex=False).to_numpy()
+    return mask
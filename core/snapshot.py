@@ -0,0 +1,111 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Folder penyimpanan snapshot kolumnar (Parquet) hasil konversi file Excel
+CACHE_DIR = Path("data/.cache")
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """
+    Sidik jari isi file sumber. Snapshot hanya dibuat ulang bila isi file berubah.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_typed_frame(df):
+    """
+    Pastikan setiap kolom object memiliki satu tipe agar bisa ditulis ke Parquet.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            non_null = df[col].dropna()
+            if non_null.map(type).nunique() > 1:
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _source_key(source):
+    # Nama file + hash path absolut: file bernama sama di folder lain punya snapshot sendiri
+    source = Path(source)
+    digest = hashlib.blake2b(str(source.resolve()).encode("utf-8"), digest_size=4).hexdigest()
+    return f"{source.stem}-{digest}"
+
+
+def snapshot_path(source, fingerprint):
+    return CACHE_DIR / f"{_source_key(source)}-{fingerprint}.parquet"
+
+
+def build_snapshot(source, read_func, fingerprint=None):
+    """
+    Baca file sumber dengan `read_func` lalu simpan sebagai snapshot Parquet.
+    Penulisan dilakukan ke file sementara kemudian di-rename (atomik), dan
+    snapshot lama dari file sumber yang sama dihapus.
+    """
+    source = Path(source)
+    fingerprint = fingerprint or file_fingerprint(source)
+    target = snapshot_path(source, fingerprint)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    df = _to_typed_frame(read_func(source))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = target.with_suffix(f".tmp{os.getpid()}")
+    pq.write_table(table, tmp)
+    os.replace(tmp, target)
+
+    # Snapshot lama file ini, termasuk nama format lama (tanpa hash path)
+    stale = list(CACHE_DIR.glob(f"{_source_key(source)}-*.parquet"))
+    stale.append(CACHE_DIR / f"{source.stem}-{fingerprint}.parquet")
+    for old in stale:
+        if old != target:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+    return target
+
+
+def load_snapshot(source, read_func, columns=None):
+    """
+    Muat data dari snapshot Parquet (memory-mapped, hanya kolom yang diminta).
+    Snapshot dibuat dari file sumber bila belum ada atau file sumber berubah.
+    """
+    fingerprint = file_fingerprint(source)
+    target = snapshot_path(source, fingerprint)
+    if not target.exists():
+        target = build_snapshot(source, read_func, fingerprint)
+    table = pq.read_table(target, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def read_bukubesar_xlsb(path):
+    return pd.read_excel(path, engine="pyxlsb")
+
+
+def read_coa_xlsx(path):
+    return pd.read_excel(path)
+
+
+def read_table(path):
+    """
+    Baca file tabel sesuai ekstensinya (xlsb, xlsx/xls, csv atau parquet).
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".xlsb":
+        return read_bukubesar_xlsb(path)
+    if suffix in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+    if suffix == ".csv":
+        return pd.read_csv(path)
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    raise ValueError(f"Format file tidak didukung: {suffix}")
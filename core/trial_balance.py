@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from core.coa import MAX_LEVEL
+from core.rollup import prefix_at_level
+
+VALUES = ("saldo", "debet", "kredit")
+
+
+class TrialBalance:
+    """
+    Neraca saldo seluruh akun x seluruh nm_unit sebagai matriks padat debet dan
+    kredit. Dibangun dengan satu kali np.bincount atas kode integer akun dan
+    unit, sehingga tidak perlu satu query per akun.
+    """
+
+    def __init__(self, accounts, units, debet, kredit):
+        self.accounts = pd.Index(accounts).astype(str)
+        self.units = pd.Index(units).astype(str)
+        self.debet = debet
+        self.kredit = kredit
+
+    @classmethod
+    def from_codes(cls, akun, unit, debet, kredit, accounts, units):
+        """
+        Akumulasi debet/kredit per pasangan kode (akun, unit). Hanya akun dan
+        unit yang memiliki transaksi yang dipertahankan.
+        """
+        n_units = len(units)
+        flat = akun.astype("int64") * n_units + unit
+        size = len(accounts) * n_units
+        debet = np.bincount(flat, weights=debet, minlength=size).reshape(len(accounts), n_units)
+        kredit = np.bincount(flat, weights=kredit, minlength=size).reshape(len(accounts), n_units)
+        count = np.bincount(flat, minlength=size).reshape(len(accounts), n_units)
+        rows = count.any(axis=1)
+        cols = count.any(axis=0)
+        return cls(
+            np.asarray(accounts)[rows], np.asarray(units)[cols],
+            debet[rows][:, cols], kredit[rows][:, cols],
+        )
+
+    @classmethod
+    def from_ledger(cls, bukubesar, exclude_jenis=("Jurnal Penutup",)):
+        """
+        Neraca saldo langsung dari baris buku besar yang sudah dinormalisasi.
+        """
+        df = bukubesar
+        if exclude_jenis:
+            df = df[~df["jns_transaksi"].isin(exclude_jenis).to_numpy()]
+        return cls.from_codes(
+            df["kd_lv_6"].cat.codes.to_numpy(),
+            df["nm_unit"].cat.codes.to_numpy(),
+            df["debet"].to_numpy(),
+            df["kredit"].to_numpy(),
+            df["kd_lv_6"].cat.categories,
+            df["nm_unit"].cat.categories,
+        )
+
+    @classmethod
+    def from_cube(cls, cube, exclude_jenis=("Jurnal Penutup",), bulan=None):
+        """
+        Neraca saldo dari LedgerCube (jauh lebih sedikit baris daripada buku besar).
+        `bulan` = (awal, akhir) inklusif sebagai bulan integer (lihat `month_index`).
+        """
+        frame = cube.frame
+        keep = np.ones(len(frame), dtype=bool)
+        if exclude_jenis:
+            excluded = cube.jenis.get_indexer(list(exclude_jenis))
+            keep &= ~np.isin(frame["jenis"].to_numpy(), excluded[excluded >= 0])
+        if bulan is not None:
+            months = frame["bulan"].to_numpy()
+            keep &= (months >= bulan[0]) & (months <= bulan[1])
+        return cls.from_codes(
+            frame["akun"].to_numpy()[keep],
+            frame["unit"].to_numpy()[keep],
+            frame["debet"].to_numpy()[keep],
+            frame["kredit"].to_numpy()[keep],
+            cube.accounts,
+            cube.units,
+        )
+
+    def rollup(self, level):
+        """
+        Neraca saldo pada level COA `level` (1..6) dengan menjumlahkan baris
+        akun yang berprefiks sama.
+        """
+        if level >= MAX_LEVEL:
+            return self
+        parents, group = np.unique(prefix_at_level(self.accounts, level).to_numpy(), return_inverse=True)
+        debet = np.zeros((len(parents), len(self.units)))
+        kredit = np.zeros((len(parents), len(self.units)))
+        np.add.at(debet, group, self.debet)
+        np.add.at(kredit, group, self.kredit)
+        return TrialBalance(parents, self.units, debet, kredit)
+
+    def values(self, value="saldo"):
+        if value == "debet":
+            return self.debet
+        if value == "kredit":
+            return self.kredit
+        return self.debet - self.kredit
+
+    def pivot(self, value="saldo", names=None, total=True):
+        """
+        Tabel pivot: baris kode akun (opsional dengan nama), kolom nm_unit,
+        nilai `value` ("saldo" = debet - kredit, "debet" atau "kredit").
+        """
+        data = self.values(value)
+        pivot = pd.DataFrame(data, columns=self.units)
+        if total:
+            pivot["Total"] = data.sum(axis=1)
+        pivot.insert(0, "Kode Akun", self.accounts)
+        if names is not None:
+            pivot.insert(1, "Nama Akun", self.accounts.map(lambda kode: names.get(kode, "")))
+        return pivot
+
+    def long(self, names=None):
+        """
+        Bentuk panjang (Kode Akun, nm_unit, debet, kredit, saldo), hanya sel yang terisi.
+        """
+        rows, cols = np.nonzero((self.debet != 0) | (self.kredit != 0))
+        frame = pd.DataFrame({
+            "Kode Akun": self.accounts[rows],
+            "nm_unit": self.units[cols],
+            "debet": self.debet[rows, cols],
+            "kredit": self.kredit[rows, cols],
+        })
+        frame["saldo"] = frame["debet"] - frame["kredit"]
+        if names is not None:
+            frame.insert(1, "Nama Akun", frame["Kode Akun"].map(names))
+        return frame
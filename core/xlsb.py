@@ -0,0 +1,89 @@
+import pandas as pd
+from pyxlsb import open_workbook
+
+
+def _text(value):
+    # Nilai sel dibandingkan sebagai teks tanpa spasi tepi, sama seperti prepare_bukubesar
+    return str(value).strip() if value is not None else ""
+
+
+def _matches_prefix(value, kode_akun):
+    kode = _text(value)
+    return kode == kode_akun or kode.startswith(kode_akun + ".")
+
+
+def stream_xlsb(path, columns=None, jenis_transaksi=None, unit=None, kode_akun=None,
+                chunk_size=50_000, progress=None, sheet=1):
+    """
+    Baca buku besar xlsb baris demi baris dengan iterator pyxlsb dan hasilkan
+    DataFrame per potongan (maksimal `chunk_size` baris). Hanya kolom `columns`
+    yang diambil, dan filter jenis transaksi / unit / awalan akun diterapkan
+    saat membaca sehingga workbook tidak pernah dimuat utuh.
+
+    `progress(baris_dibaca, total_baris)` dipanggil setiap satu potongan.
+    """
+    jenis_transaksi = {_text(j) for j in jenis_transaksi} if jenis_transaksi else None
+    unit = _text(unit) if unit else None
+    with open_workbook(str(path)) as wb:
+        with wb.get_sheet(sheet) as ws:
+            total = ws.dimension.h if ws.dimension is not None else None
+            rows = ws.rows(sparse=True)
+            header = [str(cell.v).strip() if cell.v is not None else "" for cell in next(rows, [])]
+            wanted = [c for c in (columns or header) if c in header]
+            # Kolom filter ikut dibaca walaupun tidak diminta untuk hasil
+            filter_cols = [c for c, active in (("jns_transaksi", jenis_transaksi),
+                                               ("nm_unit", unit),
+                                               ("kd_lv_6", kode_akun)) if active]
+            missing = sorted(set(columns or []).union(filter_cols) - set(header))
+            if missing:
+                raise KeyError(f"Kolom tidak ditemukan di {path}: {missing}")
+            read_cols = list(dict.fromkeys(wanted + filter_cols))
+            positions = [header.index(c) for c in read_cols]
+            i_jenis = read_cols.index("jns_transaksi") if jenis_transaksi else None
+            i_unit = read_cols.index("nm_unit") if unit else None
+            i_kode = read_cols.index("kd_lv_6") if kode_akun else None
+
+            buffer = []
+            read = 0
+            for row in rows:
+                read += 1
+                values = [row[p].v if p < len(row) else None for p in positions]
+                if i_jenis is not None and _text(values[i_jenis]) not in jenis_transaksi:
+                    pass
+                elif i_unit is not None and _text(values[i_unit]) != unit:
+                    pass
+                elif i_kode is not None and not _matches_prefix(values[i_kode], kode_akun):
+                    pass
+                else:
+                    buffer.append(values)
+                    if len(buffer) >= chunk_size:
+                        yield pd.DataFrame(buffer, columns=read_cols)[wanted]
+                        buffer = []
+
+                if progress is not None and read % chunk_size == 0:
+                    progress(read, total)
+
+            if progress is not None:
+                progress(read, total)
+            if buffer:
+                yield pd.DataFrame(buffer, columns=read_cols)[wanted]
+
+
+def read_xlsb_filtered(path, **kwargs):
+    """
+    Gabungkan hasil `stream_xlsb` menjadi satu DataFrame (hanya baris yang lolos filter).
+    """
+    chunks = list(stream_xlsb(path, **kwargs))
+    if not chunks:
+        return pd.DataFrame(columns=kwargs.get("columns") or [])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def scan_unique(path, column, progress=None):
+    """
+    Nilai unik satu kolom dengan satu kali baca bertahap (memori tetap kecil).
+    """
+    values = set()
+    for chunk in stream_xlsb(path, columns=[column], progress=progress):
+        values.update(chunk[column].dropna().astype(str).str.strip())
+    return sorted(values)
@@ -0,0 +1,68 @@
+import streamlit as st
+
+from core.integrity import CHECKS, issue_summary
+
+# Baris temuan maksimum yang ditampilkan per pemeriksaan
+MAX_ISSUE_ROWS = 1000
+
+
+def diagnostics_panel(profiler, file_name="diagnostik.json"):
+    """
+    Panel lipat berisi waktu dan memori puncak per tahap, bisa diunduh sebagai JSON.
+    """
+    with st.expander("Diagnostik Kinerja"):
+        summary = profiler.summary()
+        if summary.empty:
+            st.caption("Belum ada tahap yang diukur.")
+            return
+        summary = summary.assign(
+            stage=[("  " * d) + s for s, d in zip(summary["stage"], summary["depth"])],
+            ms=(summary["seconds"] * 1000).round(1),
+            peak_mb=summary["peak_mb"].astype(float).round(1),
+        ).drop(columns=["seconds", "depth"])
+        st.dataframe(summary, hide_index=True)
+        st.download_button(
+            "Unduh Diagnostik (JSON)",
+            data=profiler.to_json(),
+            file_name=file_name,
+            mime="application/json",
+        )
+
+
+def integrity_panel(future):
+    """
+    Panel temuan pemeriksaan integritas (lihat `core.registry.integrity_checks`).
+    Selama pemeriksaan berjalan di latar, hanya panel ini yang diperbarui berkala.
+    """
+    pending = not future.done()
+
+    @st.fragment(run_every=2 if pending else None)
+    def panel():
+        if pending and future.done():
+            # Selesai: muat ulang halaman sekali agar panel berhenti diperbarui
+            st.rerun()
+        if not future.done():
+            with st.expander("Pemeriksaan Integritas Data (berjalan...)"):
+                st.caption("Pemeriksaan berjalan di latar; halaman tetap bisa dipakai.")
+            return
+        try:
+            issues = future.result()
+        except Exception as e:
+            st.error(f"Pemeriksaan integritas gagal: {str(e)}")
+            return
+        summary = issue_summary(issues)
+        total = int(summary["Temuan"].sum())
+        with st.expander(f"Pemeriksaan Integritas Data ({total:,} temuan)", expanded=False):
+            st.dataframe(summary, hide_index=True)
+            found = [key for key, frame in issues.items() if len(frame)]
+            if not found:
+                st.success("Tidak ada temuan.")
+                return
+            for tab, key in zip(st.tabs([CHECKS[key] for key in found]), found):
+                with tab:
+                    frame = issues[key]
+                    if len(frame) > MAX_ISSUE_ROWS:
+                        st.caption(f"Menampilkan {MAX_ISSUE_ROWS:,} dari {len(frame):,} temuan.")
+                    st.dataframe(frame.head(MAX_ISSUE_ROWS), hide_index=True)
+
+    panel()
@@ -1,6 +1,62 @@
+import os
+import tempfile
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-from io import BytesIO
+
+from core.export import EXPORT_FORMATS, app_temp_dir, export_to_file
+from core.ledger import (
+    DateIndex, filter_mask, page_rows, prepare_bukubesar, run_query, sort_positions,
+    with_account_names,
+)
+from core.profiling import Profiler
+from core.query_cache import query_cache, query_key
+from core.registry import (
+    BUKUBESAR_PATH, get_coa, get_dataset, get_ledger_units, ingest_delta, integrity_checks,
+)
+from core.search import UraianIndex
+from core.xlsb import read_xlsb_filtered
+from page.diagnostics import diagnostics_panel, integrity_panel
+from page.komparatif import account_balance_comparison, register_year_expander
+
+LEDGER_COLUMNS = [
+    "no_bukti", "tgl_transaksi", "jns_transaksi", "nm_unit",
+    "kd_lv_6", "debet", "kredit", "uraian"
+]
+
+DISPLAY_COLUMNS = [
+    "no_bukti", "tgl_transaksi", "jns_transaksi", "nm_unit",
+    "kd_lv_6", "Nama Akun 6", "debet", "kredit", "uraian"
+]
+SORT_COLUMNS = ["tgl_transaksi", "no_bukti", "nm_unit", "kd_lv_6", "debet", "kredit"]
+
+
+def load_filtered_ledger(filter_args):
+    """
+    Baca bertahap baris buku besar yang lolos filter langsung dari file xlsb,
+    dengan progress bar. Hanya hasil filter yang dinormalisasi.
+    """
+    bar = st.progress(0.0, text="Membaca buku besar...")
+
+    def progress(read, total):
+        if total:
+            bar.progress(min(read / total, 1.0), text=f"Membaca buku besar... {read:,}/{total:,} baris")
+
+    data = read_xlsb_filtered(
+        BUKUBESAR_PATH,
+        columns=LEDGER_COLUMNS,
+        jenis_transaksi=filter_args["jenis_transaksi"],
+        unit=filter_args["unit"],
+        kode_akun=filter_args["kode_akun"],
+        progress=progress,
+    )
+    bar.empty()
+    data = prepare_bukubesar(data)
+    return data[filter_mask(
+        data, tipe=filter_args["tipe"], periode=filter_args["periode"], kata_kunci=filter_args["kata_kunci"]
+    )]
+
 
 def app():
     # Tambahkan CSS inline untuk mengurangi jarak antar pilihan multiselect
@@ -22,54 +78,56 @@ def app():
     st.title("Buku Besar Transaksi")
 
     # ================== DATA LOADING ==================
-    if "bukubesar" not in st.session_state:
-        try:
-            st.session_state["bukubesar"] = pd.read_excel(
-                "data/bukubesar.xlsb",
-                engine="pyxlsb"
-            )
-        except Exception as e:
-            st.error(f"Gagal memuat data bukubesar: {str(e)}")
-            return
-
-    if "coa" not in st.session_state:
-        try:
-            st.session_state["coa"] = pd.read_excel("data/coa.xlsx")
-            # Konversi semua kode akun ke string
-            for col in st.session_state["coa"].columns:
-                if 'Kode Akun' in col:
-                    st.session_state["coa"][col] = st.session_state["coa"][col].astype(str).str.strip()
-        except Exception as e:
-            st.error(f"Gagal memuat data coa: {str(e)}")
-            return
-
-    bukubesar = st.session_state["bukubesar"]
-    coa = st.session_state["coa"]
+    # Mode ledger besar: buku besar tidak dimuat utuh, tetapi dibaca bertahap dari
+    # file xlsb hanya untuk baris yang lolos filter saat "Proses Data"
+    large_mode = st.toggle(
+        "Mode ledger besar (baca bertahap dari file)",
+        key="filterdata_large_mode",
+    )
 
-    # ================== PREPROCESSING ==================
+    # Data dibagi bersama oleh semua sesi; session_state hanya menyimpan pilihan filter
     try:
-        if "tgl_transaksi" in bukubesar.columns:
-            # Parsing tanggal dengan format dd/mm/yyyy atau serial Excel
-            if bukubesar["tgl_transaksi"].dtype in ["float64", "int64"]:
-                bukubesar["tgl_transaksi"] = pd.to_datetime(
-                    bukubesar["tgl_transaksi"], 
-                    unit="D", 
-                    origin="1899-12-30"
-                )
-            else:
-                bukubesar["tgl_transaksi"] = pd.to_datetime(
-                    bukubesar["tgl_transaksi"],
-                    format="%d/%m/%Y",
-                    errors="coerce"
-                )
-            bukubesar = bukubesar.dropna(subset=["tgl_transaksi"])
+        if large_mode:
+            dataset = None
+            bukubesar = None
+            coa_index = get_coa().coa_index
         else:
-            st.error("Kolom 'tgl_transaksi' tidak ditemukan")
-            return
+            dataset = get_dataset()
+            bukubesar = dataset.bukubesar
+            coa_index = dataset.coa_index
+        coa_version = get_coa().version
     except Exception as e:
-        st.error(f"Gagal memproses tanggal: {str(e)}")
+        st.error(f"Gagal memuat data: {str(e)}")
         return
 
+    profiler = Profiler()
+    if dataset is not None:
+        profiler.extend(dataset.profile, sumber="muat data")
+
+    # Posting bulanan baru ditambahkan ke buku besar tanpa membaca ulang seluruh tahun
+    if not large_mode:
+        with st.expander("Tambah Posting Bulanan"):
+            uploaded = st.file_uploader("File ekspor bukubesar (xlsb)", type=["xlsb"])
+            if uploaded is not None and st.button("Tambahkan Posting Baru"):
+                tmp_path = None
+                try:
+                    with tempfile.NamedTemporaryFile(suffix=".xlsb", dir=app_temp_dir(), delete=False) as tmp:
+                        tmp_path = tmp.name
+                        tmp.write(uploaded.getbuffer())
+                    with st.spinner("Menambahkan posting baru..."):
+                        added = ingest_delta(tmp_path, source_name=uploaded.name)
+                    st.success(f"{added:,} posting baru ditambahkan.")
+                    dataset = get_dataset()
+                    bukubesar = dataset.bukubesar
+                except Exception as e:
+                    st.error(f"Gagal menambahkan posting: {str(e)}")
+                finally:
+                    if tmp_path is not None and os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+
+        # Temuan integritas (bukti tidak seimbang, akun di luar COA, dsb.) diperiksa di latar
+        integrity_panel(integrity_checks(dataset))
+
     # ================== LEVEL 1 CATEGORIES ==================
     level1_mapping = {
         '1': 'ASET',
@@ -103,7 +161,11 @@ def app():
     selected_unit = st.radio("Unit", ["All", "SKPD"], index=0)
     selected_skpd = None
     if selected_unit == "SKPD":
-        skpd_options = bukubesar["nm_unit"].unique()
+        if large_mode:
+            with st.spinner("Memindai daftar SKPD..."):
+                skpd_options = get_ledger_units()
+        else:
+            skpd_options = bukubesar["nm_unit"].cat.categories
         selected_skpd = st.selectbox("Pilih SKPD", options=skpd_options)
     st.markdown("---")
 
@@ -120,38 +182,28 @@ def app():
         kategori_options = list(level1_mapping.values())
         selected_kategori = st.selectbox("Kategori", options=kategori_options)
         selected_kode = [k for k, v in level1_mapping.items() if v == selected_kategori][0]
+        akun_codes = [selected_kode]
     else:
-        # Untuk level 2-6 ambil dari struktur COA
-        parent_level = target_level - 1
-        parent_col = f"Kode Akun {parent_level}"
-        name_col = f"Nama Akun {parent_level}"
-        
-        if parent_col not in coa.columns or name_col not in coa.columns:
+        # Untuk level 2-6 ambil dari pohon COA yang sudah dikompilasi
+        parent_codes = coa_index.level_codes(target_level - 1)
+        if not parent_codes:
             st.error(f"Struktur COA tidak valid untuk level {target_level}")
             return
-        
-        kategori_options = coa[[parent_col, name_col]].drop_duplicates().dropna()
-        selected_parent = st.selectbox(
+
+        selected_kode = st.selectbox(
             "Kategori Induk",
-            options=kategori_options[name_col]
+            options=parent_codes,
+            format_func=coa_index.name
         )
-        selected_kode = kategori_options[
-            kategori_options[name_col] == selected_parent
-        ][parent_col].iloc[0]
+        akun_codes = coa_index.children.get(selected_kode, [])
 
     st.markdown("---")
 
     # 5. Filter Akun Spesifik
     st.write("### Pilih Buku Besar Akun:")
-    target_col = f"Kode Akun {target_level}"
-    filtered_coa = coa[coa[target_col].fillna("").astype(str).str.startswith(selected_kode)]
-    akun_options = filtered_coa[f"Nama Akun {target_level}"].unique()
-    
-    if len(akun_options) > 0:
-        selected_akun = st.selectbox("Nama Akun", akun_options)
-        kode_akun = filtered_coa[
-            filtered_coa[f"Nama Akun {target_level}"] == selected_akun
-        ][target_col].iloc[0]
+    if len(akun_codes) > 0:
+        kode_akun = st.selectbox("Nama Akun", akun_codes, format_func=coa_index.name)
+        selected_akun = coa_index.name(kode_akun)
     else:
         st.warning("Tidak ada akun tersedia")
         return
@@ -165,81 +217,211 @@ def app():
     )
     st.markdown("---")
 
+    # 7. Filter Periode (didukung indeks waktu terurut, pencarian biner)
+    st.write("### Pilih Periode:")
+    if large_mode:
+        date_index = None
+        min_date, max_date = None, None
+    else:
+        date_index = dataset.derived("date_index", lambda ds: DateIndex(ds.bukubesar))
+        min_date, max_date = date_index.bounds()
+    period_type = st.radio(
+        "Periode", options=["Semua", "Rentang Tanggal", "Bulan", "Triwulan"], horizontal=True
+    )
+    periode = None
+    if period_type == "Rentang Tanggal":
+        selected_dates = st.date_input(
+            "Tanggal Awal - Akhir",
+            value=(min_date, max_date) if min_date else (),
+            min_value=min_date,
+            max_value=max_date,
+            format="DD/MM/YYYY",
+        )
+        if len(selected_dates) == 2:
+            periode = (str(selected_dates[0]), str(selected_dates[1]))
+    elif period_type in ("Bulan", "Triwulan") and min_date:
+        freq = "M" if period_type == "Bulan" else "Q"
+        period_options = pd.period_range(min_date, max_date, freq=freq)
+        selected_period = st.selectbox(
+            period_type, options=list(period_options), format_func=lambda p: p.strftime(
+                "%B %Y" if freq == "M" else "Triwulan %q %Y"
+            )
+        )
+        periode = (str(selected_period.start_time.date()), str(selected_period.end_time.date()))
+    elif period_type != "Semua":
+        st.info("Filter bulan/triwulan memerlukan data dimuat penuh; gunakan rentang tanggal.")
+    st.markdown("---")
+
+    # 8. Cari Uraian (indeks terbalik token; kata = awalan, "teks" = frasa)
+    def search_index():
+        # Dibangun sekali per versi data, saat pencarian uraian pertama kali dipakai
+        if large_mode or "uraian" not in bukubesar.columns:
+            return None
+        return dataset.derived("uraian_index", lambda ds: UraianIndex(ds.bukubesar["uraian"]))
+
+
+    st.write("### Cari Uraian:")
+    kata_kunci = st.text_input(
+        "Kata Kunci", placeholder='mis. honor "cv maju"',
+        help='Setiap kata dicocokkan sebagai awalan kata; teks dalam tanda kutip dicocokkan sebagai frasa.'
+    ).strip() or None
+    st.markdown("---")
+
+    filter_args = dict(
+        kode_akun=kode_akun,
+        jenis_transaksi=selected_jenis_transaksi,
+        unit=selected_skpd if selected_unit == "SKPD" else None,
+        tipe=transaction_type,
+        periode=periode,
+        kata_kunci=kata_kunci,
+    )
+
+    # ================== SALDO AKUN ==================
+    # Saldo dijawab dari cube agregat tanpa menyentuh baris transaksi
+    if not large_mode:
+        with profiler.stage("filter.saldo"):
+            if periode is None and kata_kunci is None:
+                saldo = dataset.cube.query(
+                    **{k: v for k, v in filter_args.items() if k not in ("periode", "kata_kunci")}
+                )
+            else:
+                # Rentang tanggal bebas dan kata kunci tidak tersedia di cube: pakai indeks
+                cached = query_cache.get_or_compute(
+                    query_key(filter_args, (dataset.identity, coa_version)),
+                    lambda: run_query(bukubesar, filter_args, date_index, search_index()),
+                )
+                saldo = {
+                    "saldo": cached["debet"] - cached["kredit"],
+                    "jumlah": len(cached["positions"]),
+                }
+        st.subheader("Saldo Akun")
+        st.write(f"Saldo ({selected_akun}): Rp {saldo['saldo']:,.0f} ({saldo['jumlah']:,} transaksi)")
+
+        # Saldo akun yang sama di tahun anggaran lain (dari agregat tahunan)
+        if st.toggle("Bandingkan antar tahun", key="filterdata_komparatif"):
+            register_year_expander("filterdata_tahun")
+            account_balance_comparison(filter_args)
+
     # ================== PROCESS DATA ==================
+    # Hanya parameter filter (dan hasil mode ledger besar) yang disimpan per sesi,
+    # sehingga hasil tetap tampil saat widget di bawah memicu rerun
     if st.button("Proses Data"):
-        try:
-            filtered_data = bukubesar.copy()
-            
-            # Bersihkan kolom debet dan kredit dari nilai non-numerik
-            filtered_data["debet"] = pd.to_numeric(filtered_data["debet"], errors="coerce")
-            filtered_data["kredit"] = pd.to_numeric(filtered_data["kredit"], errors="coerce")
-            
-            # Ganti nilai NaN dengan 0
-            filtered_data["debet"] = filtered_data["debet"].fillna(0)
-            filtered_data["kredit"] = filtered_data["kredit"].fillna(0)
-            
-            # Filter akun berdasarkan kategori
-            filtered_data = filtered_data[
-                filtered_data["kd_lv_6"].astype(str).str.startswith(kode_akun)
-            ]
-            
-            # Filter jenis transaksi
-            if selected_jenis_transaksi:
-                filtered_data = filtered_data[filtered_data["jns_transaksi"].isin(selected_jenis_transaksi)]
-            
-            # Filter tipe transaksi
-            if transaction_type == "Debet":
-                filtered_data = filtered_data[filtered_data["debet"] > 0]
-            elif transaction_type == "Kredit":
-                filtered_data = filtered_data[filtered_data["kredit"] > 0]
-            
-            # Filter unit
-            if selected_unit == "SKPD" and selected_skpd:
-                filtered_data = filtered_data[filtered_data["nm_unit"] == selected_skpd]
-            
-            # Gabungkan dengan COA untuk tampilkan nama akun
-            merged_data = pd.merge(
-                filtered_data,
-                coa[["Kode Akun 6", "Nama Akun 6"]],
-                left_on="kd_lv_6",
-                right_on="Kode Akun 6",
-                how="left"
-            )
-            
-            # Hitung saldo akun
-            saldo_akun = merged_data["debet"].sum() - merged_data["kredit"].sum()
-            
-            # Tampilkan saldo akun di atas tabel hasil filter
+        unit_name = selected_skpd if selected_unit == "SKPD" else "All"
+        st.session_state["filterdata_query"] = {
+            "filter_args": filter_args,
+            "large_mode": large_mode,
+            "akun": selected_akun,
+            "file_stem": f"{unit_name}_{selected_level}_{selected_akun}",
+        }
+        st.session_state.pop("filterdata_rows", None)
+        st.session_state.pop("filterdata_result", None)
+        if large_mode:
+            try:
+                with profiler.stage("load.xlsb_bertahap"):
+                    st.session_state["filterdata_rows"] = load_filtered_ledger(filter_args)
+            except Exception as e:
+                st.error(f"Terjadi kesalahan: {str(e)}")
+                st.session_state.pop("filterdata_query", None)
+
+    query = st.session_state.get("filterdata_query")
+    if query is None or query["large_mode"] != large_mode:
+        diagnostics_panel(profiler, "diagnostik_buku_besar.json")
+        return
+
+    try:
+        if large_mode:
+            source = st.session_state["filterdata_rows"]
+            saldo_akun = source["debet"].sum() - source["kredit"].sum()
             st.subheader("Saldo Akun")
-            st.write(f"Saldo ({selected_akun}): Rp {saldo_akun:,.0f}")
-            
-            # Generate nama file dinamis
-            unit_name = selected_skpd if selected_unit == "SKPD" else "All"
-            file_name = f"{unit_name}_{selected_level}_{selected_akun}.xlsx"
-            
-            # Tampilkan hasil filter
-            st.subheader("Hasil Filter")
-            top_n = st.number_input("Tampilkan Berapa Baris Teratas?", min_value=1, value=20)
-            display_data = merged_data.head(top_n)[[
-                "no_bukti", "tgl_transaksi", "jns_transaksi", "nm_unit",
-                "kd_lv_6", "Nama Akun 6", "debet", "kredit", "uraian"
-            ]]
-            st.dataframe(display_data)
-            
-            # Download hasil
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                merged_data.to_excel(writer, index=False)
-            output.seek(0)
-            st.download_button(
-                "Unduh Excel",
-                data=output,
-                file_name=file_name,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            st.write(f"Saldo ({query['akun']}): Rp {saldo_akun:,.0f} ({len(source):,} transaksi)")
+        else:
+            source = bukubesar
+
+        # Hanya posisi baris yang cocok yang disimpan; pengurutan dan pergantian
+        # halaman tidak menghitung ulang filter
+        result_key = (repr(query), None if large_mode else dataset.identity)
+        result = st.session_state.get("filterdata_result")
+        if result is None or result["key"] != result_key:
+            with profiler.stage("filter.query") as info:
+                if large_mode:
+                    positions = np.arange(len(source))
+                else:
+                    # Hasil filter dibagi antar sesi lewat cache LRU (kunci: filter + versi data)
+                    cached = query_cache.get_or_compute(
+                        query_key(query["filter_args"], (dataset.identity, coa_version)),
+                        lambda: run_query(bukubesar, query["filter_args"], date_index, search_index()),
+                    )
+                    positions = cached["positions"]
+                info["rows"] = len(positions)
+            result = {"key": result_key, "positions": positions, "sorted": {}}
+            st.session_state["filterdata_result"] = result
+
+        # Tampilkan hasil filter
+        st.subheader("Hasil Filter")
+        total_rows = len(result["positions"])
+        col_sort, col_order, col_size = st.columns(3)
+        sort_column = col_sort.selectbox("Urutkan Berdasarkan", options=["(asli)"] + SORT_COLUMNS)
+        ascending = col_order.radio("Urutan", ["Naik", "Turun"], horizontal=True) == "Naik"
+        page_size = col_size.selectbox("Baris per Halaman", options=[20, 50, 100, 500], index=0)
+
+        positions = result["positions"]
+        if sort_column != "(asli)":
+            sort_key = (sort_column, ascending)
+            if sort_key not in result["sorted"]:
+                with profiler.stage("sort", column=sort_column):
+                    result["sorted"] = {sort_key: sort_positions(source, positions, sort_column, ascending)}
+            positions = result["sorted"][sort_key]
+
+        page_count = max(1, -(-total_rows // page_size))
+        page = st.number_input(
+            f"Halaman (1-{page_count})", min_value=1, max_value=page_count, value=1
+        )
+        st.caption(f"{total_rows:,} transaksi cocok")
+        if not large_mode:
+            stats = query_cache.stats()
+            st.caption(
+                f"Cache query: {stats['entries']} entri, {stats['size_mb']:.1f}/{stats['budget_mb']:.0f} MB, "
+                f"hit {stats['hits']} / miss {stats['misses']}"
             )
-            
-        except Exception as e:
-            st.error(f"Terjadi kesalahan: {str(e)}")
 
-# Jalankan aplikasi
-app()
+        with profiler.stage("merge.nama_akun"):
+            page_data = page_rows(source, positions, page - 1, page_size)
+            display_data = with_account_names(page_data, coa_index.names)[DISPLAY_COLUMNS]
+        st.dataframe(display_data)
+        
+        # Download hasil: file hanya dibuat saat diminta, ditulis langsung ke disk
+        st.subheader("Unduh Hasil")
+        export_format = st.radio(
+            "Format File", options=list(EXPORT_FORMATS), horizontal=True, key="filterdata_export_format"
+        )
+        ext, mime = EXPORT_FORMATS[export_format]
+        export = st.session_state.get("filterdata_export")
+        if st.button("Siapkan File Unduhan"):
+            with st.spinner("Menyiapkan file..."), profiler.stage(f"export.{ext}", rows=len(positions)):
+                # Baris lengkap hanya dimaterialisasi saat ekspor diminta
+                export_data = with_account_names(source.iloc[positions], coa_index.names)
+                path = export_to_file(export_data, export_format)
+            if export and os.path.exists(export["path"]):
+                os.remove(export["path"])
+            export = {"path": path, "format": export_format, "query": query, "order": (sort_column, ascending),
+                      "key": result_key}
+            st.session_state["filterdata_export"] = export
+
+        if (export and export["format"] == export_format and export["query"] == query
+                and export["order"] == (sort_column, ascending) and export.get("key") == result_key
+                and os.path.exists(export["path"])):
+            with open(export["path"], "rb") as f:
+                st.download_button(
+                    f"Unduh {export_format}",
+                    data=f,
+                    file_name=f"{query['file_stem']}.{ext}",
+                    mime=mime
+                )
+        
+    except Exception as e:
+        st.error(f"Terjadi kesalahan: {str(e)}")
+
+    diagnostics_panel(profiler, "diagnostik_buku_besar.json")
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from core.multiyear import aggregate_account_balance, percent_change
+from core.registry import register_year, year_aggregates
+
+
+def register_year_expander(key):
+    """
+    Unggah buku besar tahun anggaran lain sebagai pembanding.
+    """
+    with st.expander("Daftarkan Buku Besar Tahun Lain"):
+        year = st.number_input("Tahun Anggaran", min_value=1990, max_value=2100, value=2023, key=f"{key}_year")
+        uploaded = st.file_uploader(
+            "File buku besar", type=["xlsb", "xlsx", "csv", "parquet"], key=f"{key}_upload"
+        )
+        if uploaded is not None and st.button("Daftarkan", key=f"{key}_register"):
+            try:
+                register_year(uploaded.getbuffer(), year, Path(uploaded.name).suffix.lower())
+                st.success(f"Buku besar tahun {year} didaftarkan.")
+            except Exception as e:
+                st.error(f"Gagal mendaftarkan buku besar: {str(e)}")
+
+
+def load_year_aggregates():
+    """
+    Agregat tahunan dengan progress bar; tahun yang belum dihitung diproses paralel.
+    """
+    bar = st.progress(0.0, text="Menghitung agregat tahunan...")
+
+    def progress(done, total):
+        bar.progress(done / total, text=f"Menghitung agregat tahunan... {done}/{total} tahun")
+
+    try:
+        return year_aggregates(progress=progress)
+    except Exception as e:
+        st.error(f"Gagal menghitung agregat tahunan: {str(e)}")
+        return None
+    finally:
+        bar.empty()
+
+
+def year_pair(years, key):
+    """
+    Pilihan tahun berjalan dan tahun pembanding (bawaan: dua tahun terakhir).
+    """
+    col_year, col_prior = st.columns(2)
+    year = col_year.selectbox("Tahun", options=years[::-1], key=f"{key}_tahun")
+    prior_options = [y for y in years[::-1] if y != year]
+    prior = col_prior.selectbox("Pembanding", options=prior_options, key=f"{key}_pembanding")
+    return year, prior
+
+
+def comparison_column_config(frame):
+    config = {col: st.column_config.NumberColumn(format="localized") for col in frame.columns[2:-1]}
+    config["% Perubahan"] = st.column_config.NumberColumn(format="%.1f%%")
+    return config
+
+
+def account_balance_comparison(filter_args):
+    """
+    Saldo akun hasil filter (akun, jenis transaksi, unit) untuk setiap tahun
+    terdaftar, beserta selisih dan % perubahan terhadap tahun sebelumnya.
+    """
+    aggregates = load_year_aggregates()
+    if not aggregates:
+        return
+    rows = [
+        {"Tahun": year, **aggregate_account_balance(
+            agg, filter_args["kode_akun"], filter_args["jenis_transaksi"], filter_args["unit"]
+        )}
+        for year, agg in aggregates.items()
+    ]
+    table = pd.DataFrame(rows)
+    table["Selisih"] = table["saldo"].diff()
+    table["% Perubahan"] = percent_change(table["saldo"], table["saldo"].shift())
+    st.dataframe(
+        table,
+        hide_index=True,
+        column_config={
+            "Tahun": st.column_config.NumberColumn(format="%d"),
+            **{col: st.column_config.NumberColumn(format="localized")
+               for col in ["debet", "kredit", "saldo", "jumlah", "Selisih"]},
+            "% Perubahan": st.column_config.NumberColumn(format="%.1f%%"),
+        },
+    )
+    if len(aggregates) < 2:
+        st.caption("Belum ada tahun pembanding; daftarkan buku besar tahun lain.")
+    st.caption("Perbandingan antar tahun memakai filter akun, jenis transaksi dan unit "
+               "(tanpa periode, tipe dan kata kunci).")
@@ -0,0 +1,60 @@
+import pandas as pd
+import streamlit as st
+from io import BytesIO
+
+from core.profiling import Profiler
+from core.registry import get_dataset, statement_rollup
+from page.diagnostics import diagnostics_panel
+
+def generate_lo():
+    st.title("Laporan Operasional (LO)")
+
+    # Load data dari registry bersama (hanya-baca)
+    try:
+        dataset = get_dataset()
+    except Exception as e:
+        st.error(f"Data bukubesar atau coa gagal dimuat: {str(e)}")
+        return
+
+    # Validasi: COA harus memiliki akun dengan Laporan "LO" (kode 7 dan 8)
+    if "Laporan" not in dataset.coa.columns or not (dataset.coa["Laporan"] == "LO").any():
+        st.error("COA tidak memiliki akun dengan Laporan 'LO'.")
+        return
+
+    # Fungsi untuk format mata uang
+    def format_currency(value):
+        return f"Rp {value:,.0f}" if pd.notnull(value) else "Rp 0"
+
+    # Rollup saldo yang sama dengan LRA: tidak ada pemindaian buku besar tambahan
+    profiler = Profiler()
+    with profiler.stage("rollup.lo") as info:
+        df_lo = statement_rollup(dataset).statement("LO")
+        info["rows"] = len(df_lo)
+
+    # Formatting output
+    df_lo["Saldo"] = df_lo["Saldo"].apply(format_currency)
+
+    # Menampilkan tabel
+    st.subheader("Laporan Operasional")
+    st.table(df_lo[["Kode Rek", "Uraian", "Saldo"]])
+
+    # Tombol download
+    with profiler.stage("export.xlsx"):
+        output = BytesIO()
+        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+            df_lo.to_excel(writer, index=False)
+        output.seek(0)
+    st.download_button(
+        "Unduh LO",
+        data=output,
+        file_name="Laporan_Operasional.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+    diagnostics_panel(profiler, "diagnostik_lo.json")
+
+def app():
+    generate_lo()
+
+if __name__ == "__main__":
+    app()
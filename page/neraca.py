@@ -0,0 +1,59 @@
+import pandas as pd
+import streamlit as st
+from io import BytesIO
+
+from core.neraca import NeracaEngine, build_neraca
+from core.registry import get_dataset
+
+def generate_neraca():
+    st.title("Laporan Neraca")
+    
+    # Load data dari registry bersama (hanya-baca)
+    try:
+        dataset = get_dataset()
+    except Exception as e:
+        st.error(f"Data bukubesar atau coa gagal dimuat: {str(e)}")
+        return
+    
+    # Engine saldo bulanan dibangun sekali per versi data dan dipakai semua sesi
+    engine = dataset.derived("neraca", lambda ds: NeracaEngine(ds.bukubesar))
+    month_options = engine.month_labels()
+    if not month_options:
+        st.warning("Tidak ada transaksi untuk akun neraca (kelas 1-3).")
+        return
+    
+    # Tanggal laporan: saldo awal + mutasi sampai akhir bulan terpilih
+    selected_month = st.select_slider(
+        "Posisi per Akhir Bulan", options=month_options, value=month_options[-1]
+    )
+    
+    # Fungsi untuk format mata uang
+    def format_currency(value):
+        return f"Rp {value:,.0f}" if pd.notnull(value) else "Rp 0"
+    
+    df_neraca = build_neraca(engine, dataset.coa, selected_month)
+    
+    # Formatting output
+    df_neraca["Saldo"] = df_neraca["Saldo"].apply(format_currency)
+    
+    # Menampilkan tabel
+    st.subheader(f"Neraca per {selected_month}")
+    st.table(df_neraca[["Kode Rek", "Uraian", "Saldo"]])
+    
+    # Tombol download
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df_neraca.to_excel(writer, index=False)
+    output.seek(0)
+    st.download_button(
+        "Unduh Neraca",
+        data=output,
+        file_name=f"Neraca_{selected_month}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+def app():
+    generate_neraca()
+
+if __name__ == "__main__":
+    app()
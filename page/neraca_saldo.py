@@ -0,0 +1,92 @@
+import os
+
+import streamlit as st
+
+from core.coa import MAX_LEVEL
+from core.export import EXPORT_FORMATS, export_to_file
+from core.neraca import month_label
+from core.profiling import Profiler
+from core.registry import get_dataset
+from core.trial_balance import TrialBalance
+from page.diagnostics import diagnostics_panel
+
+def generate_neraca_saldo():
+    st.title("Neraca Saldo per SKPD")
+
+    # Load data dari registry bersama (hanya-baca)
+    try:
+        dataset = get_dataset()
+    except Exception as e:
+        st.error(f"Data bukubesar atau coa gagal dimuat: {str(e)}")
+        return
+    cube = dataset.cube
+    coa_index = dataset.coa_index
+
+    months = sorted(int(m) for m in cube.frame["bulan"].unique())
+    if not months:
+        st.warning("Buku besar tidak berisi transaksi.")
+        return
+
+    # Pilihan laporan
+    col_level, col_value = st.columns(2)
+    level = col_level.selectbox("Level Akun", options=list(range(1, MAX_LEVEL + 1)), index=2)
+    value = col_value.radio("Nilai", ["Saldo", "Debet", "Kredit"], horizontal=True)
+    exclude_jenis = st.multiselect(
+        "Kecualikan Jenis Transaksi",
+        options=list(cube.jenis),
+        default=[j for j in ["Jurnal Penutup"] if j in cube.jenis],
+    )
+    labels = [month_label(m) for m in months]
+    if len(labels) > 1:
+        start, end = st.select_slider("Periode", options=labels, value=(labels[0], labels[-1]))
+    else:
+        start = end = labels[0]
+    bulan = (months[labels.index(start)], months[labels.index(end)])
+
+    # Satu kali bincount atas cube (akun x unit), lalu rollup ke level terpilih
+    profiler = Profiler()
+    try:
+        with profiler.stage("rollup.neraca_saldo") as info:
+            tb = TrialBalance.from_cube(cube, exclude_jenis, bulan).rollup(level)
+            pivot = tb.pivot(value.lower(), names=coa_index.names)
+            info["rows"] = len(pivot)
+    except Exception as e:
+        st.error(f"Gagal menyusun neraca saldo: {str(e)}")
+        return
+
+    st.subheader(f"Neraca Saldo Level {level} ({start} s.d. {end})")
+    st.caption(f"{len(tb.accounts):,} akun x {len(tb.units):,} SKPD")
+    money_columns = {col: st.column_config.NumberColumn(format="localized") for col in pivot.columns[2:]}
+    st.dataframe(pivot, hide_index=True, column_config=money_columns)
+
+    # Unduh pivot: file hanya dibuat saat diminta
+    export_format = st.radio(
+        "Format File", options=list(EXPORT_FORMATS), horizontal=True, key="neraca_saldo_export_format"
+    )
+    ext, mime = EXPORT_FORMATS[export_format]
+    request = (dataset.identity, level, value, tuple(exclude_jenis), bulan, export_format)
+    export = st.session_state.get("neraca_saldo_export")
+    if st.button("Siapkan File Unduhan"):
+        with st.spinner("Menyiapkan file..."), profiler.stage(f"export.{ext}", rows=len(pivot)):
+            path = export_to_file(pivot, export_format)
+        if export and os.path.exists(export["path"]):
+            os.remove(export["path"])
+        export = {"path": path, "request": request}
+        st.session_state["neraca_saldo_export"] = export
+
+    if export and export["request"] == request and os.path.exists(export["path"]):
+        with open(export["path"], "rb") as f:
+            st.download_button(
+                f"Unduh {export_format}",
+                data=f,
+                file_name=f"Neraca_Saldo_L{level}_{start}_{end}.{ext}",
+                mime=mime
+            )
+
+    diagnostics_panel(profiler, "diagnostik_neraca_saldo.json")
+
+def app():
+    generate_neraca_saldo()
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,75 @@
+import streamlit as st
+
+from core.analitis import benford_test, flag_outliers, monthly_variance, outlier_stats, unit_variance
+from core.registry import get_dataset
+
+def generate_prosedur_analitis():
+    st.title("Prosedur Analitis")
+    
+    # Load data dari registry bersama (hanya-baca)
+    try:
+        dataset = get_dataset()
+    except Exception as e:
+        st.error(f"Data bukubesar atau coa gagal dimuat: {str(e)}")
+        return
+    bukubesar = dataset.bukubesar
+    coa_index = dataset.coa_index
+    
+    # Hasil analisis dihitung sekali per versi data dan parameter, dibagi antar sesi
+    def cached(name, compute):
+        return dataset.derived(name, lambda ds: compute())
+    
+    tab_bulan, tab_skpd, tab_benford, tab_pencilan = st.tabs(
+        ["Varians Bulanan", "Varians SKPD", "Benford", "Pencilan"]
+    )
+    
+    # ================== VARIANS BULANAN ==================
+    with tab_bulan:
+        level = st.selectbox("Level Akun", options=range(1, 7), index=2, key="analitis_level_bulan")
+        result = cached(f"analitis_bulan_{level}", lambda: monthly_variance(bukubesar, level))
+        result = result.assign(**{"Nama Akun": result["Kode Akun"].map(coa_index.names)})
+        min_pct = st.number_input("Tampilkan perubahan minimal (%)", min_value=0.0, value=50.0)
+        view = result[result["Perubahan (%)"].abs() >= min_pct]
+        st.caption(f"{len(view):,} dari {len(result):,} baris akun x bulan")
+        st.dataframe(view[["Kode Akun", "Nama Akun", "Bulan", "Saldo", "Selisih", "Perubahan (%)"]])
+    
+    # ================== VARIANS SKPD ==================
+    with tab_skpd:
+        level = st.selectbox("Level Akun", options=range(1, 7), index=2, key="analitis_level_skpd")
+        result = cached(f"analitis_skpd_{level}", lambda: unit_variance(bukubesar, level))
+        akun = st.selectbox(
+            "Akun", options=result["Kode Akun"].unique(),
+            format_func=lambda kode: f"{kode} - {coa_index.name(kode, '')}",
+        )
+        view = result[result["Kode Akun"] == akun].sort_values("Selisih dari Median", key=abs, ascending=False)
+        st.dataframe(view)
+    
+    # ================== BENFORD ==================
+    with tab_benford:
+        kolom = st.radio("Kolom", ["debet", "kredit"], horizontal=True)
+        table, stats = cached(f"analitis_benford_{kolom}", lambda: benford_test(bukubesar[kolom]))
+        st.write(
+            f"N = {stats['n']:,} | Chi-square = {stats['chi_square']:,.1f} | "
+            f"MAD = {stats['mad']:.4f} ({'sesuai' if stats['mad'] <= 0.015 else 'tidak sesuai'} Benford)"
+        )
+        st.bar_chart(table.set_index("Digit")[["Aktual", "Benford"]])
+        st.dataframe(table)
+    
+    # ================== PENCILAN ==================
+    with tab_pencilan:
+        method = st.radio("Metode", ["zscore", "iqr"], horizontal=True,
+                          format_func={"zscore": "Z-score", "iqr": "IQR"}.get)
+        threshold = st.number_input(
+            "Ambang", min_value=0.5, value=3.0 if method == "zscore" else 1.5, step=0.5
+        )
+        # Statistik kelompok di-cache per metode; ambang diterapkan ulang setiap rerun
+        stats = cached(f"analitis_pencilan_{method}", lambda: outlier_stats(bukubesar, method))
+        result = flag_outliers(bukubesar, stats, threshold)
+        st.caption(f"{len(result):,} transaksi ditandai per kelompok akun x SKPD")
+        st.dataframe(result.head(1000))
+
+def app():
+    generate_prosedur_analitis()
+
+if __name__ == "__main__":
+    app()
@@ -1,3 +1,6 @@
+import importlib
+import time
+
 import streamlit as st
 from streamlit_option_menu import option_menu
 
@@ -29,13 +32,14 @@ p {
 """
 add_css(css_styles)
 
-# Impor modul-modul halaman dari folder `page/`
-try:
-    from page.filterdata import app as filter_data_app
-    from page.lra import app as lra_app
-except ImportError as e:
-    st.error(f"Error importing modules: {str(e)}")
-    st.stop()
+# Modul halaman diimpor saat halaman dipilih saja, sehingga membuka Main Page
+# atau LRA tidak ikut memuat halaman lain (mis. Buku Besar)
+def load_page(module_name):
+    try:
+        return importlib.import_module(module_name).app
+    except ImportError as e:
+        st.error(f"Error importing modules: {str(e)}")
+        st.stop()
 
 # ----------- HALAMAN UTAMA -----------
 def main_page():
@@ -48,33 +52,39 @@ def main_page():
     - **Filter Data**: Memfilter data transaksi.
     - **LRA**: Laporan Realisasi Anggaran.
     - **Neraca**: Laporan Neraca.
+    - **Neraca Saldo**: Saldo seluruh akun x SKPD dalam satu tabel pivot.
     - **LO**: Laporan Operasional.
     - **Prosedur Analitis**: Melakukan analisis prosedural.
     """)
 
 # ----------- HALAMAN FILTER DATA -----------
 def filter_data_page():
-    filter_data_app()
+    load_page("page.filterdata")()
 
 # ----------- HALAMAN LRA -----------
 def lra_page():
     st.title("Halaman LRA")
-    lra_app()
+    load_page("page.lra")()
 
 # ----------- HALAMAN NERACA -----------
 def neraca_page():
     st.title("Halaman Neraca")
-    neraca_app()
+    load_page("page.neraca")()
+
+# ----------- HALAMAN NERACA SALDO -----------
+def neraca_saldo_page():
+    st.title("Halaman Neraca Saldo")
+    load_page("page.neraca_saldo")()
 
 # ----------- HALAMAN LO -----------
 def lo_page():
     st.title("Halaman LO")
-    lo_app()
+    load_page("page.lo")()
 
 # ----------- HALAMAN PROSEDUR ANALITIS -----------
 def prosedur_analitis_page():
     st.title("Halaman Prosedur Analitis")
-    prosedur_analitis_app()
+    load_page("page.prosedur_analitis")()
 
 # ----------- KONFIGURASI NAVIGASI -----------
 page_config = {
@@ -82,6 +92,7 @@ page_config = {
     "Filter Data": filter_data_page,
     "LRA": lra_page,
     "Neraca": neraca_page,
+    "Neraca Saldo": neraca_saldo_page,
     "LO": lo_page,
     "Prosedur Analitis": prosedur_analitis_page,
 }
@@ -90,8 +101,8 @@ page_config = {
 with st.sidebar:
     selected = option_menu(
         menu_title="Menu Navigasi",  # Judul menu
-        options=["Main Page", "Filter Data", "LRA", "Neraca", "LO", "Prosedur Analitis"],  # Opsi menu
-        icons=["house", "funnel", "bar-chart", "clipboard-data", "file-earmark-text", "gear"],  # Ikon untuk setiap opsi
+        options=["Main Page", "Filter Data", "LRA", "Neraca", "Neraca Saldo", "LO", "Prosedur Analitis"],  # Opsi menu
+        icons=["house", "funnel", "bar-chart", "clipboard-data", "table", "file-earmark-text", "gear"],  # Ikon untuk setiap opsi
         menu_icon="cast",  # Ikon utama untuk menu
         default_index=0,  # Halaman default saat aplikasi dimuat
         styles={
@@ -113,6 +124,8 @@ with st.sidebar:
 # ----------- RENDER HALAMAN -----------
 if selected in page_config:
     # Panggil fungsi halaman yang sesuai berdasarkan pilihan sidebar
+    started = time.perf_counter()
     page_config[selected]()
+    st.sidebar.caption(f"Halaman dimuat dalam {time.perf_counter() - started:.2f} dtk")
 else:
     st.error("Halaman tidak ditemukan")